@@ -1,9 +1,17 @@
+import logging
+import os
 from flask import Flask
 from flask_cors import CORS
 from config.config import Config
-from database.db_connection import mongo
+from database.db_connection import mongo, warmup
 from controllers.test_controller import test_bp
 from controllers.match_controller import match_bp
+from controllers.user_controller import user_bp
+from controllers.admin_controller import admin_bp
+from controllers.metrics_controller import metrics_bp
+from services.artifact_service import follow_active_version
+from utils import metrics
+from utils.profiler import SlowRequestSampler
 
 def create_app():
     app = Flask(__name__)
@@ -11,6 +19,9 @@ def create_app():
     # Load Config
     app.config.from_object(Config)
 
+    logging.basicConfig(level=app.config["LOG_LEVEL"],
+                        format="%(asctime)s level=%(levelname)s logger=%(name)s %(message)s")
+
     # Enable CORS
     CORS(app)
 
@@ -20,10 +31,29 @@ def create_app():
     # Register Blueprints
     app.register_blueprint(test_bp, url_prefix="/api/test")
     app.register_blueprint(match_bp, url_prefix="/api")
+    app.register_blueprint(user_bp, url_prefix="/api/users")
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
+    app.register_blueprint(metrics_bp)
+
+    # Request/stage histograms for /metrics, plus stack samples of slow requests if enabled
+    profiler = None
+    if app.config["SLOW_REQUEST_PROFILE_MS"] > 0:
+        profiler = SlowRequestSampler(app.config["SLOW_REQUEST_PROFILE_MS"],
+                                      app.config["SLOW_REQUEST_SAMPLE_INTERVAL_MS"])
+    metrics.init_app(app, profiler)
+
+    # Pick up an artifact version activated by another worker or scripts/artifacts.py
+    app.before_request(follow_active_version)
+
+    # Artifacts load lazily; `flask warmup` or WARMUP_ON_START pays the cost up front
+    app.cli.command("warmup")(warmup)
+    if app.config["WARMUP_ON_START"]:
+        warmup()
 
     return app
 
 
 if __name__ == "__main__":
     app = create_app()
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    # Development server only; production runs gunicorn -c gunicorn.conf.py wsgi:app
+    app.run(debug=app.config["DEBUG"], host="0.0.0.0", port=int(os.getenv("PORT", "5000")))
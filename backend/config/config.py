@@ -1,5 +1,81 @@
 import os
 
+
+def env_flag(name, default):
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "mysecretkey")
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/skillmatchplus")
+    # Max pairs scored by one /predict_friendship/batch request
+    FRIENDSHIP_BATCH_LIMIT = int(os.getenv("FRIENDSHIP_BATCH_LIMIT", "100000"))
+    # POST /recommend/batch: max user_ids per request, users per FAISS search call
+    RECOMMEND_BATCH_LIMIT = int(os.getenv("RECOMMEND_BATCH_LIMIT", "500000"))
+    RECOMMEND_SEARCH_BATCH_SIZE = int(os.getenv("RECOMMEND_SEARCH_BATCH_SIZE", "1024"))
+    RECOMMEND_MAX_TOP_N = int(os.getenv("RECOMMEND_MAX_TOP_N", "100"))
+    # GET /recommend/<id>?mode=rerank: ANN candidates re-ranked by the friendship model.
+    # Final score = (1 - weight) * similarity + weight * P(strong collaboration)
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "50"))
+    RERANK_WEIGHT = float(os.getenv("RERANK_WEIGHT", "0.3"))
+    RERANK_ANN_BUDGET_MS = float(os.getenv("RERANK_ANN_BUDGET_MS", "20"))
+    RERANK_MODEL_BUDGET_MS = float(os.getenv("RERANK_MODEL_BUDGET_MS", "30"))
+    # While stage 2 looks too slow to fit, still run it once this often to re-measure
+    RERANK_PROBE_SECONDS = float(os.getenv("RERANK_PROBE_SECONDS", "30"))
+    # /community pagination, when the request passes ?offset= or ?limit=
+    COMMUNITY_PAGE_SIZE = int(os.getenv("COMMUNITY_PAGE_SIZE", "100"))
+    COMMUNITY_MAX_PAGE_SIZE = int(os.getenv("COMMUNITY_MAX_PAGE_SIZE", "1000"))
+    # Sentence encoder used by prepare_full_data.py to build embeddings.npy
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    # POST /match/text query encoder: micro-batch size/wait, LRU of recent query vectors
+    ENCODER_MAX_BATCH_SIZE = int(os.getenv("ENCODER_MAX_BATCH_SIZE", "64"))
+    ENCODER_MAX_WAIT_MS = float(os.getenv("ENCODER_MAX_WAIT_MS", "5"))
+    ENCODER_CACHE_SIZE = int(os.getenv("ENCODER_CACHE_SIZE", "10000"))
+    # Rewrite faiss.index / embeddings.npy after this many ingested users
+    INDEX_CHECKPOINT_EVERY = int(os.getenv("INDEX_CHECKPOINT_EVERY", "100"))
+    # `python app.py` development server; never enable in production (wsgi.py + gunicorn.conf.py)
+    DEBUG = env_flag("FLASK_DEBUG", False)
+    # This process owns /api/users writes, the delta log and checkpoints. Exactly one
+    # process (a single worker) may run with it on; multi-worker read servers set it to 0
+    WRITES_ENABLED = env_flag("WRITES_ENABLED", True)
+    # /api/admin (cache flush, artifact activation) needs this value in an X-Admin-Token
+    # header; unset, the admin routes are disabled
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+    # gunicorn.conf.py: forked worker processes x threads each (one worker while
+    # writes are enabled). FAISS gets FAISS_OMP_THREADS OpenMP threads per worker
+    # (0 = cores // workers, so workers don't oversubscribe the machine)
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1" if WRITES_ENABLED else str(os.cpu_count() or 1)))
+    WEB_THREADS = int(os.getenv("WEB_THREADS", "4"))
+    FAISS_OMP_THREADS = int(os.getenv("FAISS_OMP_THREADS", "0"))
+    # Artifacts load lazily on first use; set to load everything at startup instead
+    WARMUP_ON_START = env_flag("WARMUP_ON_START", False)
+    # Memory-map embeddings.npy / faiss.index so workers share page-cache pages
+    MMAP_EMBEDDINGS = env_flag("MMAP_EMBEDDINGS", True)
+    MMAP_FAISS_INDEX = env_flag("MMAP_FAISS_INDEX", True)
+    # Serve /recommend from scripts/precompute_neighbors.py output when it covers the user
+    USE_NEIGHBOR_TABLE = env_flag("USE_NEIGHBOR_TABLE", True)
+    # /recommend, /community and /predict_friendship result cache. A user write drops
+    # only the entries that user or their community appears in; a new user shows up
+    # in other users' cached matches once those expire, hence the short TTL
+    CACHE_ENABLED = env_flag("CACHE_ENABLED", True)
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")  # e.g. redis://localhost:6379/0 (needs `redis`)
+    # key=value log lines at this level and above (DEBUG adds one line per friendship prediction)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    # Per-route/per-stage latency histograms on GET /metrics (per worker process)
+    METRICS_ENABLED = env_flag("METRICS_ENABLED", True)
+    # > 0: sample the stacks of requests running longer than this and log the hottest ones
+    SLOW_REQUEST_PROFILE_MS = float(os.getenv("SLOW_REQUEST_PROFILE_MS", "0"))
+    SLOW_REQUEST_SAMPLE_INTERVAL_MS = float(os.getenv("SLOW_REQUEST_SAMPLE_INTERVAL_MS", "5"))
+    # Where embeddings.npy, faiss.index, models/ and processed_dataset.csv live
+    DATA_DIR = os.getenv("SKILLMATCH_DATA_DIR", BACKEND_DIR)
+    # Workers check DATA_DIR/artifacts/CURRENT this often and load a newly activated version
+    ARTIFACT_POLL_SECONDS = float(os.getenv("ARTIFACT_POLL_SECONDS", "10"))
+    # Per-thread SQLite connections: wait this long on a locked database, cache this many statements
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+    SQLITE_PATH = os.getenv("SKILLMATCH_SQLITE_PATH", os.path.join(BACKEND_DIR, "database", "skillmatch.db"))
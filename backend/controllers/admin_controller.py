@@ -0,0 +1,47 @@
+import hmac
+from flask import Blueprint, jsonify, request
+from config.config import Config
+from database.artifacts import ArtifactError
+from database.db_connection import response_cache
+from services.artifact_service import activate_version, artifact_status
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.before_request
+def require_admin_token():
+    # These routes swap artifacts and flush the cache: off unless ADMIN_TOKEN is set
+    if not Config.ADMIN_TOKEN:
+        return jsonify({"error": "The admin API is disabled; set ADMIN_TOKEN to enable it"}), 403
+    token = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode()):
+        return jsonify({"error": "Missing or wrong X-Admin-Token"}), 401
+
+@admin_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    # Hit/miss/eviction counters (this worker) for sizing CACHE_MAX_ENTRIES / CACHE_TTL_SECONDS
+    return jsonify(response_cache.stats()), 200
+
+@admin_bp.route('/cache', methods=['DELETE'])
+def clear_cache():
+    response_cache.clear()
+    return jsonify({"cleared": True}), 200
+
+@admin_bp.route('/artifacts', methods=['GET'])
+def artifacts():
+    # Active version, any load in progress, last failure and the versions on disk
+    return jsonify(artifact_status()), 200
+
+@admin_bp.route('/artifacts/activate', methods=['POST'])
+def activate_artifacts():
+    data = request.get_json(silent=True) or {}
+    version = data.get("version")
+    if not isinstance(version, str):
+        return jsonify({"error": "Missing version"}), 400
+    try:
+        started = activate_version(version)
+    except ArtifactError as e:
+        return jsonify({"error": str(e)}), 404
+    if not started:
+        return jsonify({"error": "Another version is still loading", **artifact_status()}), 409
+    # Loads and validates in the background; poll GET /artifacts for the outcome
+    return jsonify({"loading": version}), 202
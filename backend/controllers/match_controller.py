@@ -1,24 +1,149 @@
-from flask import Blueprint, jsonify
-from services.matching_service import get_top_matches
-from services.community_service import get_same_community_users
-from services.friendship_service import predict_friendship
+import json
+import logging
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
+from services.matching_service import get_top_matches, iter_batch_top_matches, match_text
+from services.community_service import (
+    community_cache_tags, get_same_community_users, iter_same_community_users, get_community_size
+)
+from services.friendship_service import predict_friendship, predict_friendship_batch, predict_friendship_for_candidates
+from services.rerank_service import get_reranked_matches
+from database.db_connection import response_cache
+from utils.cache import user_tag
+from utils.metrics import timed
 
 match_bp = Blueprint('match', __name__)
+logger = logging.getLogger(__name__)
+
+def _match_tags(user_id):
+    # Cached matches go stale when the user or anyone listed in them changes
+    return lambda matches: [user_tag(user_id)] + [user_tag(match["user_id"]) for match in matches]
+
+def _is_user_id(value):
+    # JSON integers only (no bools or floats), within the int64 range the services use
+    return isinstance(value, int) and not isinstance(value, bool) and -2**63 <= value < 2**63
+
+def _json(payload):
+    # jsonify, recorded as the "serialize" stage
+    with timed("serialize"):
+        return jsonify(payload)
 
 @match_bp.route('/recommend/<int:user_id>', methods=['GET'])
 def recommend(user_id):
-    matches = get_top_matches(user_id)
-    return jsonify(matches), 200
+    # ?mode=rerank blends in the friendship model (collaboration_score); default is pure similarity
+    if request.args.get('mode') == 'rerank':
+        matches = response_cache.get_or_compute("recommend_rerank", (user_id,),
+                                                lambda: get_reranked_matches(user_id), _match_tags(user_id))
+        return _json(matches), 200
+    matches = response_cache.get_or_compute("recommend", (user_id,), lambda: get_top_matches(user_id),
+                                            _match_tags(user_id))
+    return _json(matches), 200
+
+@match_bp.route('/match/text', methods=['POST'])
+def match_text_route():
+    # Body: {"interests": [...]} or {"text": "..."}, optional "top_n"
+    payload = request.get_json(silent=True) or {}
+    interests = payload.get("interests")
+    if interests is not None:
+        if not isinstance(interests, list) or not all(isinstance(i, str) for i in interests):
+            return jsonify({"error": "'interests' must be a list of strings"}), 400
+        text = " ".join(sorted(set(interests)))  # Same combination, same text, any order
+    else:
+        text = payload.get("text")
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({"error": "Provide 'interests' or a non-empty 'text'"}), 400
+
+    max_top_n = current_app.config["RECOMMEND_MAX_TOP_N"]
+    top_n = payload.get("top_n", 5)
+    if not isinstance(top_n, int) or not 1 <= top_n <= max_top_n:
+        return jsonify({"error": f"top_n must be an integer between 1 and {max_top_n}"}), 400
+
+    return _json(match_text(text, top_n)), 200
+
+@match_bp.route('/recommend/batch', methods=['POST'])
+def recommend_batch():
+    # Body: {"user_ids": [u1, u2, ...], "top_n": 5}; streams one NDJSON line per user
+    payload = request.get_json(silent=True) or {}
+    user_ids = payload.get("user_ids")
+    limit = current_app.config["RECOMMEND_BATCH_LIMIT"]
+    max_top_n = current_app.config["RECOMMEND_MAX_TOP_N"]
+
+    if not isinstance(user_ids, list) or not all(_is_user_id(u) for u in user_ids):
+        return jsonify({"error": "Provide 'user_ids' as a list of integer IDs"}), 400
+    if len(user_ids) > limit:
+        return jsonify({"error": f"At most {limit} user_ids per request"}), 400
+    top_n = payload.get("top_n", 5)
+    if not isinstance(top_n, int) or not 1 <= top_n <= max_top_n:
+        return jsonify({"error": f"top_n must be an integer between 1 and {max_top_n}"}), 400
+
+    batch_size = current_app.config["RECOMMEND_SEARCH_BATCH_SIZE"]
+    lines = (json.dumps(result) + "\n" for result in iter_batch_top_matches(user_ids, top_n, batch_size))
+    return Response(stream_with_context(lines), mimetype="application/x-ndjson")
 
 
 
 @match_bp.route('/community/<int:user_id>', methods=['GET'])
 def community(user_id):
-    community_users = get_same_community_users(user_id)
-    return jsonify(community_users), 200
+    # ?offset=&limit= pages the community; ?format=ndjson streams it. Without either
+    # parameter the whole community comes back, as it did before paging existed
+    offset = max(0, request.args.get('offset', 0, type=int))
+    stream = request.args.get('format') == 'ndjson'
+    paged = 'offset' in request.args or 'limit' in request.args
+    default_limit = current_app.config["COMMUNITY_PAGE_SIZE"] if paged and not stream else None
+    limit = request.args.get('limit', default_limit, type=int)
+    if limit is not None and not stream:
+        limit = min(limit, current_app.config["COMMUNITY_MAX_PAGE_SIZE"])
+    if limit is not None:
+        limit = max(0, limit)
+
+    tags = community_cache_tags(user_id)
+    total = response_cache.get_or_compute("community_size", (user_id,), lambda: get_community_size(user_id), tags)
+    headers = {"X-Total-Count": str(total)}
+    if limit is not None and offset + limit < total:
+        headers["X-Next-Offset"] = str(offset + limit)
+
+    if stream:
+        lines = (json.dumps(member) + "\n" for member in iter_same_community_users(user_id, offset, limit))
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson", headers=headers)
+
+    community_users = response_cache.get_or_compute(
+        "community", (user_id, offset, limit), lambda: get_same_community_users(user_id, offset, limit), tags
+    )
+    return _json(community_users), 200, headers
 
 @match_bp.route('/predict_friendship/<int:user1_id>/<int:user2_id>', methods=['GET'])
 def predict_friendship_route(user1_id, user2_id):
-    result = predict_friendship(user1_id, user2_id)
-    print(f"FRIENDSHIP PREDICTION DEBUG: User {user1_id} vs User {user2_id}: {result}")
-    return jsonify({"prediction": result}), 200
+    result = response_cache.get_or_compute(
+        "predict_friendship", (user1_id, user2_id), lambda: predict_friendship(user1_id, user2_id),
+        [user_tag(user1_id), user_tag(user2_id)]
+    )
+    logger.debug("friendship_prediction user1_id=%d user2_id=%d result=%r", user1_id, user2_id, result)
+    return _json({"prediction": result}), 200
+
+@match_bp.route('/predict_friendship/batch', methods=['POST'])
+def predict_friendship_batch_route():
+    # Body: {"pairs": [[u1, u2], ...]} or {"user_id": u, "candidate_ids": [c1, c2, ...]}
+    payload = request.get_json(silent=True) or {}
+    limit = current_app.config["FRIENDSHIP_BATCH_LIMIT"]
+
+    if "pairs" in payload:
+        pairs = payload["pairs"]
+        if isinstance(pairs, list) and len(pairs) > limit:
+            return jsonify({"error": f"At most {limit} pairs per request"}), 400
+        if not isinstance(pairs, list) or not all(
+            isinstance(pair, list) and len(pair) == 2 and all(_is_user_id(u) for u in pair) for pair in pairs
+        ):
+            return jsonify({"error": "Pairs must be [user1_id, user2_id] lists of integer IDs"}), 400
+        results = predict_friendship_batch(pairs)
+    elif "user_id" in payload and "candidate_ids" in payload:
+        user_id, candidate_ids = payload["user_id"], payload["candidate_ids"]
+        if isinstance(candidate_ids, list) and len(candidate_ids) > limit:
+            return jsonify({"error": f"At most {limit} candidates per request"}), 400
+        if not _is_user_id(user_id) or not isinstance(candidate_ids, list) or not all(
+            _is_user_id(c) for c in candidate_ids
+        ):
+            return jsonify({"error": "'user_id' and 'candidate_ids' must be integer IDs"}), 400
+        results = predict_friendship_for_candidates(user_id, candidate_ids)
+    else:
+        return jsonify({"error": "Provide 'pairs' or 'user_id' with 'candidate_ids'"}), 400
+
+    return _json({"predictions": results}), 200
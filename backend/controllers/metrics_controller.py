@@ -0,0 +1,44 @@
+from flask import Blueprint, Response
+from database.db_connection import get_artifacts, get_user_store_if_loaded, response_cache
+from utils.metrics import render_gauge, render_histograms
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def _cache_lines():
+    stats = response_cache.stats()
+    events = [({"event": event}, stats[event])
+              for event in ("hits", "misses", "evictions", "expirations", "invalidations", "errors")]
+    return (
+        render_gauge("skillmatch_cache_events_total", "Response cache lookups and removals", events, kind="counter")
+        + render_gauge("skillmatch_cache_entries", "Entries in the response cache", [({}, stats["entries"])])
+        + render_gauge("skillmatch_cache_epoch", "Artifact epoch cache keys are built with", [({}, stats["epoch"])])
+        + render_gauge("skillmatch_cache_sequence", "Per-user cache invalidations so far", [({}, stats["sequence"])])
+    )
+
+def _index_lines():
+    # Only what is already loaded: a scrape must never trigger a multi-second load
+    artifacts = get_artifacts()
+    version = [({"version": artifacts.version or "flat"}, 1)]
+    embeddings = artifacts.embeddings.get() if artifacts.embeddings.loaded else None
+    faiss_index = artifacts.faiss_index.get() if artifacts.faiss_index.loaded else None
+    neighbor_table = artifacts.neighbor_table.get() if artifacts.neighbor_table.loaded else None
+    user_store = get_user_store_if_loaded()
+    return (
+        render_gauge("skillmatch_artifact_info", "Active artifact version", version)
+        + render_gauge("skillmatch_users", "Users in the resident store",
+                       [({}, len(user_store) if user_store is not None else None)])
+        + render_gauge("skillmatch_embedding_rows", "Rows in the embedding store (including superseded ones)",
+                       [({}, len(embeddings) if embeddings is not None else None)])
+        + render_gauge("skillmatch_faiss_vectors", "Vectors in the FAISS index",
+                       [({}, faiss_index.ntotal if faiss_index is not None else None)])
+        + render_gauge("skillmatch_faiss_index_mmapped", "1 while the index is a read-only mapping",
+                       [({}, int(artifacts.index_state["mmapped"]) if faiss_index is not None else None)])
+        + render_gauge("skillmatch_neighbor_table_users", "Users covered by the precomputed neighbour table",
+                       [({}, len(neighbor_table) if neighbor_table is not None else None)])
+    )
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus text format; numbers are per worker process
+    lines = render_histograms() + _cache_lines() + _index_lines()
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
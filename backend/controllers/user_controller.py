@@ -0,0 +1,56 @@
+from flask import Blueprint, jsonify, request
+from config.config import Config
+from services.ingest_service import ingest_user, edit_user, remove_user, sync_embeddings
+
+user_bp = Blueprint('users', __name__)
+
+@user_bp.before_request
+def require_writer():
+    # Writes have a single owner process (see wsgi.py)
+    if not Config.WRITES_ENABLED:
+        return jsonify({"error": "This server is read-only (WRITES_ENABLED=0); send writes to the ingest server"}), 503
+
+def _interests(payload):
+    # Kept as phrases for the friendship features; profile_text alone is split into words
+    interests = payload.get("interests")
+    if isinstance(interests, list) and all(isinstance(i, str) for i in interests):
+        return interests
+    return None
+
+@user_bp.route('/', methods=['POST'], strict_slashes=False)
+def create_user():
+    # Body: {"name", "dob", "city", "interests": [...]} (or "profile_text")
+    payload = request.get_json(silent=True) or {}
+    name = payload.get("name")
+    profile_text = payload.get("profile_text") or " ".join(payload.get("interests") or [])
+    if not name or not profile_text:
+        return jsonify({"error": "'name' and at least one interest are required"}), 400
+
+    user = ingest_user(name, payload.get("dob"), payload.get("city"), profile_text, _interests(payload))
+    return jsonify(user), 201
+
+@user_bp.route('/sync', methods=['POST'])
+def sync_users():
+    # Embed users that were written to SQLite without going through the API
+    added = sync_embeddings()
+    return jsonify({"embedded": added}), 200
+
+@user_bp.route('/<int:user_id>', methods=['PUT'])
+def update_user_route(user_id):
+    # Replaces the profile and its vector; same body as POST
+    payload = request.get_json(silent=True) or {}
+    name = payload.get("name")
+    profile_text = payload.get("profile_text") or " ".join(payload.get("interests") or [])
+    if not name or not profile_text:
+        return jsonify({"error": "'name' and at least one interest are required"}), 400
+
+    user = edit_user(user_id, name, payload.get("dob"), payload.get("city"), profile_text, _interests(payload))
+    if user is None:
+        return jsonify({"error": f"UserID {user_id} not found"}), 404
+    return jsonify(user), 200
+
+@user_bp.route('/<int:user_id>', methods=['DELETE'])
+def delete_user_route(user_id):
+    if not remove_user(user_id):
+        return jsonify({"error": f"UserID {user_id} not found"}), 404
+    return jsonify({"deleted": user_id}), 200
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import time
+
+# Versioned artifact layout under DATA_DIR:
+#   artifacts/<version>/embeddings.npy(.json), vector_ids.npy, faiss.index(.json),
+#                       models/friendship_model.pkl, models/cluster_{centroids,labels}.npy,
+#                       neighbors.*
+#   artifacts/<version>/manifest.json   files, sizes, sha256, build info
+#   artifacts/CURRENT                   name of the active version
+# Without artifacts/CURRENT the flat DATA_DIR layout is used as-is.
+
+ARTIFACTS_DIRNAME = "artifacts"
+CURRENT_FILENAME = "CURRENT"
+MANIFEST_FILENAME = "manifest.json"
+
+REQUIRED_FILES = ("embeddings.npy", "faiss.index", os.path.join("models", "friendship_model.pkl"))
+OPTIONAL_FILES = (
+    "vector_ids.npy", "faiss.index.json", "embeddings.npy.json", os.path.join("models", "cluster_centroids.npy"),
+    os.path.join("models", "cluster_labels.npy"),
+    "neighbors.json", "neighbors.users.npy", "neighbors.ids.npy", "neighbors.distances.npy",
+)
+# Rewritten in place by ingest checkpoints, so only their presence is checked
+MUTABLE_FILES = {"embeddings.npy", "vector_ids.npy", "faiss.index", "faiss.index.json"}
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def artifacts_root(data_dir):
+    return os.path.join(data_dir, ARTIFACTS_DIRNAME)
+
+
+def active_version(data_dir):
+    try:
+        with open(os.path.join(artifacts_root(data_dir), CURRENT_FILENAME)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def artifact_dir(data_dir, version=None):
+    # Directory of `version` (default: the active one), or the flat data dir
+    version = version or active_version(data_dir)
+    return os.path.join(artifacts_root(data_dir), version) if version else data_dir
+
+
+def set_active_version(data_dir, version):
+    path = os.path.join(artifacts_root(data_dir), CURRENT_FILENAME)
+    with open(path + ".tmp", "w") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILENAME)) as f:
+        return json.load(f)
+
+
+def list_versions(data_dir):
+    root = artifacts_root(data_dir)
+    if not os.path.isdir(root):
+        return []
+    versions = []
+    for name in sorted(os.listdir(root)):
+        if os.path.exists(os.path.join(root, name, MANIFEST_FILENAME)):
+            versions.append(read_manifest(os.path.join(root, name)))
+    return versions
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(directory, version, checksums=True, **info):
+    files = {}
+    for name in REQUIRED_FILES + OPTIONAL_FILES:
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        entry = {"size": os.path.getsize(path)}
+        if checksums and name not in MUTABLE_FILES:
+            entry["sha256"] = _sha256(path)
+        files[name] = entry
+    manifest = {"version": version, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "files": files, **info}
+    path = os.path.join(directory, MANIFEST_FILENAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+def validate_files(directory):
+    # Raises ArtifactError unless every required file exists and immutable ones match the manifest
+    try:
+        manifest = read_manifest(directory)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Unreadable manifest in {directory}: {e}")
+    for name in REQUIRED_FILES:
+        if name not in manifest.get("files", {}):
+            raise ArtifactError(f"Manifest of {manifest.get('version')} is missing {name}")
+    for name, entry in manifest.get("files", {}).items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            raise ArtifactError(f"{name} listed in the manifest but not found")
+        if name in MUTABLE_FILES:
+            continue
+        if os.path.getsize(path) != entry["size"]:
+            raise ArtifactError(f"{name} is {os.path.getsize(path)} bytes, manifest says {entry['size']}")
+        if "sha256" in entry and _sha256(path) != entry["sha256"]:
+            raise ArtifactError(f"{name} checksum does not match the manifest")
+    return manifest
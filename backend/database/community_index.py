@@ -0,0 +1,143 @@
+import bisect
+import threading
+from array import array
+import numpy as np
+
+
+def nearest_centroid(vectors, centroids):
+    # (n, d) vectors -> (n,) index of the closest centroid by L2 distance
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, centroids.shape[1])
+    distances = (centroids * centroids).sum(axis=1) - 2.0 * (vectors @ centroids.T)
+    return distances.argmin(axis=1)
+
+
+class CommunityIndex:
+    """Interest_Cluster -> member rows.
+
+    The bulk of the membership is one stable argsort of the KMeans labels
+    with per-cluster offsets (CSR style); rows assigned after load go to a
+    small per-cluster append list. Deleted and replaced rows keep their slot
+    in that order and are listed per cluster, so sizes and pages count live
+    members only.
+    """
+
+    def __init__(self, labels):
+        self._lock = threading.Lock()
+        labels = np.asarray(labels, dtype=np.int64)
+        self._labels = array('q', labels.tolist())
+
+        self._order = np.argsort(labels, kind='stable').astype(np.int64)
+        sorted_labels = labels[self._order]
+        clusters, starts, counts = np.unique(sorted_labels, return_index=True, return_counts=True)
+        self._ranges = {
+            int(cluster): (int(start), int(start + count))
+            for cluster, start, count in zip(clusters, starts, counts)
+            if cluster >= 0
+        }
+        self._appended = {}
+        self._dead = {}  # cluster -> sorted member slots of deleted/replaced rows
+
+    def __len__(self):
+        return len(self._labels)
+
+    def cluster_of(self, row):
+        if row < 0 or row >= len(self._labels):
+            return -1
+        return self._labels[row]
+
+    def unassigned_rows(self):
+        return np.flatnonzero(np.frombuffer(self._labels, dtype=np.int64) < 0)
+
+    def _slot_count(self, cluster):
+        start, stop = self._ranges.get(cluster, (0, 0))
+        return (stop - start) + len(self._appended.get(cluster, ()))
+
+    def size(self, cluster):
+        return self._slot_count(cluster) - len(self._dead.get(cluster, ()))
+
+    def _slots(self, cluster, first, last):
+        # Member slots [first, last): the bulk range, then the appended rows
+        start, stop = self._ranges.get(cluster, (0, 0))
+        bulk = self._order[start + first:min(stop, start + last)]
+        if start + last <= stop:
+            return bulk
+        appended = self._appended.get(cluster, array('q'))
+        extra_start = max(0, first - (stop - start))
+        extra = np.array(appended[extra_start:last - (stop - start)], dtype=np.int64)
+        return np.concatenate([bulk, extra])
+
+    @staticmethod
+    def _slot_of_live(dead, live):
+        # Slot of the live-th live member, skipping the (sorted) dead slots before it
+        slot = live
+        for dead_slot in dead:
+            if dead_slot > slot:
+                break
+            slot += 1
+        return slot
+
+    def members(self, cluster, offset=0, limit=None):
+        # Live rows [offset, offset + limit) of the cluster, in O(limit + dead members)
+        size = self.size(cluster)
+        end = size if limit is None else min(size, offset + limit)
+        if offset >= end:
+            return np.empty(0, dtype=np.int64)
+
+        dead = self._dead.get(cluster, [])
+        first = self._slot_of_live(dead, offset)
+        last = self._slot_of_live(dead, end - 1) + 1
+        rows = self._slots(cluster, first, last)
+        skipped = dead[bisect.bisect_left(dead, first):bisect.bisect_left(dead, last)]
+        if skipped:
+            rows = rows[~np.isin(np.arange(first, last), skipped)]
+        return rows
+
+    def _slot_of_row(self, cluster, row):
+        # Bulk and appended rows are both ascending within a cluster
+        start, stop = self._ranges.get(cluster, (0, 0))
+        i = int(np.searchsorted(self._order[start:stop], row))
+        if i < stop - start and self._order[start + i] == row:
+            return i
+        appended = self._appended.get(cluster, array('q'))
+        j = bisect.bisect_left(appended, row)
+        if j < len(appended) and appended[j] == row:
+            return (stop - start) + j
+        return None
+
+    def remove(self, row):
+        # A deleted user, or the old row of an edited one, stops counting as a member
+        with self._lock:
+            cluster = self.cluster_of(row)
+            if cluster < 0:
+                return
+            slot = self._slot_of_row(cluster, row)
+            dead = self._dead.setdefault(cluster, [])
+            i = bisect.bisect_left(dead, slot) if slot is not None else None
+            if i is not None and (i == len(dead) or dead[i] != slot):
+                dead.insert(i, slot)
+
+    def assign(self, row, cluster):
+        with self._lock:
+            while len(self._labels) <= row:
+                self._labels.append(-1)
+            if self._labels[row] >= 0:
+                return  # Cluster membership is fixed once assigned
+            self._labels[row] = cluster
+            if cluster >= 0:
+                self._appended.setdefault(cluster, array('q')).append(row)
+
+    def assign_nearest(self, rows, vectors, centroids):
+        # Place not-yet-clustered rows by nearest centroid (rows already in a cluster keep it)
+        for row, cluster in zip(rows, nearest_centroid(vectors, centroids)):
+            self.assign(int(row), int(cluster))
+
+    def on_rows_added(self, store, start, stop):
+        # New users start unclustered; an edited profile keeps its old cluster
+        with self._lock:
+            while len(self._labels) < stop:
+                self._labels.append(-1)
+        for pos in range(start, stop):
+            previous = store.replaced_from.get(pos)
+            if previous is not None:
+                self.assign(pos, self.cluster_of(previous))
+                self.remove(previous)
@@ -1,44 +1,370 @@
+import json
 import os
-import sqlite3
-import numpy as np
+import time
+import pandas as pd
 import joblib
-import faiss
+import numpy as np
+from flask import g, has_request_context
 from flask_pymongo import PyMongo
+from database.user_store import UserStore, add_interests_column
+from database.interest_index import InterestIndex
+from database.feature_table import FeatureTable
+from database.community_index import CommunityIndex
+from database.embedding_store import EmbeddingStore
+from database.sqlite_pool import SQLiteConnections
+from database.artifacts import active_version, artifact_dir
+from database.neighbor_table import load_neighbor_table, meta_mtime
+from database.vector_index import load_index, read_meta, save_index, writable_copy
+from utils.locks import RWLock
+from utils.cache import ResponseCache, cluster_tag, user_tag
+from utils.lazy import LazyResource
+from utils.metrics import timed
+from config.config import Config
 
 # Initialize Mongo (still optional for future use)
 mongo = PyMongo()
 
-# 📦 Correct Paths (relative to backend folder)
+# 📦 Correct Paths (relative to backend folder, overridable through Config).
+# Embeddings, index, models and neighbour table come from the active artifact
+# version (see database/artifacts.py); the user database and dataset don't.
 base_path = os.path.dirname(os.path.abspath(__file__))  # backend/database
-backend_path = os.path.abspath(os.path.join(base_path, ".."))
+backend_path = Config.DATA_DIR
+db_path = Config.SQLITE_PATH
+dataset_path = os.path.join(backend_path, "processed_dataset.csv")
+
+# Searches take index_lock.read(); adds/removes and artifact swaps take index_lock.write()
+index_lock = RWLock()
+
+# Route results; writes invalidate cache_tags() of the users they touch, batch
+# changes (artifact swap, new neighbour table) call bump_epoch()
+response_cache = ResponseCache(maxsize=Config.CACHE_MAX_ENTRIES, ttl=Config.CACHE_TTL_SECONDS,
+                               enabled=Config.CACHE_ENABLED, redis_url=Config.CACHE_REDIS_URL)
+
+# 📂 SQLite: per-thread connections (WAL); queries use get_sqlite_reader(),
+# inserts/updates/deletes use get_sqlite_writer()
+sqlite_connections = SQLiteConnections(db_path, busy_timeout_ms=Config.SQLITE_BUSY_TIMEOUT_MS,
+                                       cached_statements=Config.SQLITE_CACHED_STATEMENTS)
+get_sqlite_reader = sqlite_connections.reader
+get_sqlite_writer = sqlite_connections.writer
+
+# --- Lazily loaded resources ---
+# Nothing heavy happens at import time; each artifact loads on first use
+# (or all at once through warmup()).
+
+def _load_user_store():
+    # 📂 Resident user store (loaded once, refreshed incrementally on insert)
+    store = UserStore()
+    if Config.WRITES_ENABLED:
+        add_interests_column(get_sqlite_writer())  # Databases migrated before the column existed
+    store.load(get_sqlite_reader())
+    return store
+
+def _load_embeddings(artifacts):
+    # 📂 Load embeddings (plus any vectors ingested since the last checkpoint).
+    # vector_ids.npy maps each row to its UserID; older builds were positional.
+    store = get_user_store()
+    vectors = EmbeddingStore(artifacts.embeddings_path, artifacts.vector_ids_path, default_ids=store.user_ids,
+                             mmap=Config.MMAP_EMBEDDINGS, read_only=not Config.WRITES_ENABLED)
+    for stale_user_id in [uid for uid in vectors.ids if uid >= 0 and store.row_of(uid) is None]:
+        vectors.forget(stale_user_id)  # Deleted from SQLite since the vectors were written
+    return vectors
+
+def _load_faiss_index(artifacts):
+    # 📂 Load FAISS index, keyed by UserID
+    vectors = artifacts.embeddings.get()
+    index, changed, mmapped = load_index(artifacts.faiss_index_path, vectors, mmap=Config.MMAP_FAISS_INDEX)
+    artifacts.index_state["embedding_rows"] = len(vectors)
+    artifacts.index_state["mmapped"] = mmapped
+    artifacts.index_state["rescore_factor"] = int(read_meta(artifacts.faiss_index_path).get("rescore_factor", 1))
+    if changed and Config.WRITES_ENABLED:  # Read-only processes never rewrite artifact files
+        save_index(index, artifacts.faiss_index_path, len(vectors))
+    return index
+
+def _load_neighbor_table(artifacts):
+    # 📂 Precomputed top-K neighbours (None until scripts/precompute_neighbors.py has run)
+    if not Config.USE_NEIGHBOR_TABLE:
+        return None
+    return load_neighbor_table(artifacts.neighbor_table_path)
+
+def _load_friendship_model(artifacts):
+    # 📂 Load friendship model (optional if you're using friendship strength feature)
+    return joblib.load(artifacts.friendship_model_path)
+
+def _load_dataset():
+    # 📂 Load processed dataset (Cleaned_Interests, Country, Gender, Interest_Cluster),
+    # lined up with the store rows by UserID
+    df = pd.read_csv(dataset_path).drop_duplicates('UserID').set_index('UserID', drop=False)
+    return df.reindex(get_user_store().user_ids).reset_index(drop=True)
+
+def _load_interest_index():
+    # 📂 Interest -> users inverted index, kept in sync with the store
+    index = InterestIndex()
+    get_user_store().subscribe(index.on_rows_added)
+    return index
+
+def _load_feature_table():
+    # 📂 Per-user friendship features, built once and extended on insert
+    df = get_dataset()
+    table = FeatureTable(initial_capacity=max(1024, len(df)))
+    table.extend_from_dataset(df, get_user_store())
+    get_user_store().subscribe(table.on_rows_added)
+    return table
+
+def _load_cluster_centroids(artifacts):
+    # 📂 KMeans centroids for placing new users (None for builds that predate them)
+    if not os.path.exists(artifacts.cluster_centroids_path):
+        return None
+    return np.load(artifacts.cluster_centroids_path).astype('float32')
+
+def _load_community_index(artifacts):
+    # 📂 Cluster -> members index from the version's cluster_labels.npy (UserID,
+    # cluster). Flat builds without one fall back to processed_dataset.csv.
+    store = get_user_store()
+    if os.path.exists(artifacts.cluster_labels_path):
+        pairs = np.load(artifacts.cluster_labels_path)
+        pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+        labels = np.full(len(store), -1, dtype=np.int64)
+        if len(pairs):
+            pos = np.minimum(np.searchsorted(pairs[:, 0], store.user_ids), len(pairs) - 1)
+            found = pairs[pos, 0] == store.user_ids
+            labels[found] = pairs[pos[found], 1]
+    elif artifacts.version is None:
+        df = get_dataset()
+        labels = df['Interest_Cluster'].fillna(-1) if 'Interest_Cluster' in df else [-1] * len(df)
+    else:
+        labels = [-1] * len(store)  # Older version: everyone joins the nearest centroid below
+    index = CommunityIndex(labels)
+    store.subscribe(index.on_rows_added)
+    # Users deleted since the labels were written stop counting as members
+    for row in np.flatnonzero(store.user_ids[:len(index)] < 0):
+        index.remove(int(row))
+
+    # Users added after the clustering run (API sign-ups, rows missing from the
+    # labels) join the nearest centroid if they already have a vector
+    centroids = artifacts.cluster_centroids.get()
+    if centroids is not None:
+        embeddings = artifacts.embeddings.get()
+        rows = index.unassigned_rows()
+        rows = rows[rows < len(store)]
+        vector_rows = embeddings.rows_of(store.user_ids[rows])
+        has_vector = vector_rows >= 0
+        rows, vector_rows = rows[has_vector], vector_rows[has_vector]
+        for start in range(0, len(rows), 65536):
+            index.assign_nearest(rows[start:start + 65536], embeddings[vector_rows[start:start + 65536]], centroids)
+    return index
+
+class Artifacts:
+    """One artifact version: its file paths and the resources loaded from them.
+
+    The active set sits behind a single module-level reference, so a new
+    version can be loaded and checked off to the side and then swapped in
+    with one assignment (swap_artifacts). Requests that already hold the
+    old set finish on it.
+    """
+
+    def __init__(self, directory, version=None):
+        self.directory = directory
+        self.version = version
+        self.embeddings_path = os.path.join(directory, "embeddings.npy")
+        self.vector_ids_path = os.path.join(directory, "vector_ids.npy")
+        self.faiss_index_path = os.path.join(directory, "faiss.index")
+        self.friendship_model_path = os.path.join(directory, "models", "friendship_model.pkl")
+        self.cluster_centroids_path = os.path.join(directory, "models", "cluster_centroids.npy")
+        self.cluster_labels_path = os.path.join(directory, "models", "cluster_labels.npy")
+        self.neighbor_table_path = os.path.join(directory, "neighbors")  # Prefix of the neighbors.* files
+        # embedding_rows: embedding rows reflected in the index (updated under index_lock.write())
+        # mmapped: index is a read-only mapping that must be copied before mutating
+        # rescore_factor: > 1 for quantized indexes (see database/vector_index.py)
+        self.index_state = {"embedding_rows": 0, "mmapped": False, "rescore_factor": 1}
+        self.embeddings = LazyResource(lambda: _load_embeddings(self))
+        self.faiss_index = LazyResource(lambda: _load_faiss_index(self))
+        self.neighbor_table = LazyResource(lambda: _load_neighbor_table(self))
+        self.friendship_model = LazyResource(lambda: _load_friendship_model(self))
+        self.cluster_centroids = LazyResource(lambda: _load_cluster_centroids(self))
+        self.community_index = LazyResource(lambda: _load_community_index(self))
 
-# 📂 Load SQLite database
-db_path = os.path.join(base_path, "skillmatch.db")
-sqlite_conn = sqlite3.connect(db_path, check_same_thread=False)
-sqlite_cursor = sqlite_conn.cursor()
+    def resources(self):
+        return (self.embeddings, self.faiss_index, self.neighbor_table, self.friendship_model,
+                self.cluster_centroids, self.community_index)
 
-# 📂 Load embeddings
-embeddings_path = os.path.join(backend_path, "embeddings.npy")
-embeddings = np.load(embeddings_path)
+_artifacts = Artifacts(artifact_dir(Config.DATA_DIR), active_version(Config.DATA_DIR))
+_neighbor_table_checked = 0.0  # time.monotonic() of the last neighbors.json check
 
-# 📂 Load FAISS index
-faiss_index_path = os.path.join(backend_path, "faiss.index")
-faiss_index = faiss.read_index(faiss_index_path)
+_user_store = LazyResource(_load_user_store)
+_dataset = LazyResource(_load_dataset)
+_interest_index = LazyResource(_load_interest_index)
+_feature_table = LazyResource(_load_feature_table)
 
-# 📂 Load friendship model (optional if you're using friendship strength feature)
-friendship_model_path = os.path.join(backend_path, "models", "friendship_model.pkl")
-friendship_model = joblib.load(friendship_model_path)
+get_user_store = _user_store.get
+get_dataset = _dataset.get
+get_interest_index = _interest_index.get
+get_feature_table = _feature_table.get
+
+def get_artifacts():
+    # One snapshot per request: every getter below returns the same version
+    # for the whole request, even if a swap lands halfway through it
+    if not has_request_context():
+        return _artifacts
+    if "artifacts" not in g:
+        g.artifacts = _artifacts
+    return g.artifacts
+
+def current_artifacts():
+    # The live set regardless of the request's snapshot; writes go here
+    return _artifacts
+
+def get_user_store_if_loaded():
+    # For stats that must not trigger a load
+    return _user_store.get() if _user_store.loaded else None
+
+def get_embeddings():
+    return get_artifacts().embeddings.get()
+
+def get_faiss_index():
+    return get_artifacts().faiss_index.get()
+
+def get_friendship_model():
+    return get_artifacts().friendship_model.get()
+
+def get_cluster_centroids():
+    return get_artifacts().cluster_centroids.get()
+
+def get_community_index():
+    return get_artifacts().community_index.get()
+
+def get_index_state():
+    return get_artifacts().index_state
+
+def swap_artifacts(artifacts):
+    # Waits for in-flight searches/index writes, then points every getter at `artifacts`
+    global _artifacts
+    with index_lock.write():
+        previous, _artifacts = _artifacts, artifacts
+    if previous.community_index.loaded:
+        get_user_store().unsubscribe(previous.community_index.get().on_rows_added)
+    response_cache.bump_epoch()
+
+def get_neighbor_table():
+    # Picks up a table republished by the nightly job without a restart; the
+    # file is checked at most every ARTIFACT_POLL_SECONDS, not per request
+    global _neighbor_table_checked
+    artifacts = get_artifacts()
+    table = artifacts.neighbor_table.get()
+    now = time.monotonic()
+    if not Config.USE_NEIGHBOR_TABLE or now - _neighbor_table_checked < Config.ARTIFACT_POLL_SECONDS:
+        return table
+    _neighbor_table_checked = now
+    loaded_mtime = table.mtime if table is not None else None
+    if meta_mtime(artifacts.neighbor_table_path) != loaded_mtime:
+        table = _load_neighbor_table(artifacts)
+        artifacts.neighbor_table.set(table)
+        response_cache.bump_epoch()
+    return table
+
+def get_writable_faiss_index(artifacts=None):
+    # Call with index_lock.write() held: swaps a read-only mmap for an in-memory copy
+    artifacts = artifacts or _artifacts
+    index = artifacts.faiss_index.get()
+    if artifacts.index_state["mmapped"]:
+        index = writable_copy(index)
+        artifacts.faiss_index.set(index)
+        artifacts.index_state["mmapped"] = False
+    return index
+
+def cache_tags(user_ids, artifacts=None):
+    # Tags of the cached results that can mention these users: their own and their communities'
+    artifacts = artifacts or _artifacts
+    tags = [user_tag(user_id) for user_id in user_ids]
+    if artifacts.community_index.loaded:
+        community_index = artifacts.community_index.get()
+        user_store = get_user_store()
+        for user_id in user_ids:
+            row = user_store.row_of(user_id)
+            cluster = community_index.cluster_of(row) if row is not None else -1
+            if cluster >= 0:
+                tags.append(cluster_tag(cluster))
+    return tags
+
+def warmup():
+    # Explicit hook (startup flag, `flask warmup`, pre-fork) to pay load costs up front
+    get_sqlite_reader()
+    for resource in (_user_store, _dataset, *_artifacts.resources(), _interest_index, _feature_table):
+        resource.get()
 
 # --- Helper functions for SQLite Access ---
 
 def fetch_all_users():
     query = "SELECT UserID, Name, City, DOB, Profile_Text FROM users"
-    sqlite_cursor.execute(query)
-    rows = sqlite_cursor.fetchall()
+    with timed("sql_fetch"):
+        cursor = get_sqlite_reader().cursor()
+        cursor.execute(query)
+        rows = cursor.fetchall()
     return rows
 
 def fetch_user_by_id(user_id):
     query = "SELECT UserID, Name, City, DOB, Profile_Text FROM users WHERE UserID = ?"
-    sqlite_cursor.execute(query, (user_id,))
-    row = sqlite_cursor.fetchone()
+    with timed("sql_fetch"):
+        cursor = get_sqlite_reader().cursor()
+        cursor.execute(query, (user_id,))
+        row = cursor.fetchone()
     return row
+
+def _interests_json(interests):
+    # The phrases as given, so feature rows code them like the dataset's Cleaned_Interests
+    return json.dumps(list(interests)) if interests else None
+
+def insert_user(name, dob, city, profile_text, user_id=None, interests=None):
+    user_store = get_user_store()  # Loading it adds the Interests column to older databases
+    conn = get_sqlite_writer()
+    cursor = conn.cursor()
+    if user_id is None:
+        # Next UserID is assigned inside the INSERT so concurrent writers can't collide
+        cursor.execute(
+            "INSERT INTO users (UserID, Name, DOB, City, Profile_Text, Interests) "
+            "SELECT COALESCE(MAX(UserID), 0) + 1, ?, ?, ?, ?, ? FROM users",
+            (name, dob, city, profile_text, _interests_json(interests))
+        )
+    else:
+        cursor.execute(
+            "INSERT INTO users (UserID, Name, DOB, City, Profile_Text, Interests) VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, name, dob, city, profile_text, _interests_json(interests))
+        )
+    conn.commit()
+    cursor.execute("SELECT UserID FROM users WHERE id = ?", (cursor.lastrowid,))
+    user_id = cursor.fetchone()[0]
+    # Pull this row (and anything other writers added) into the resident store
+    user_store.refresh(conn)
+    response_cache.invalidate(*cache_tags([user_id]))
+    return user_id
+
+def update_user(user_id, name, dob, city, profile_text, interests=None):
+    user_store = get_user_store()
+    conn = get_sqlite_writer()
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE users SET Name = ?, DOB = ?, City = ?, Profile_Text = ?, Interests = ? WHERE UserID = ?",
+        (name, dob, city, profile_text, _interests_json(interests), user_id)
+    )
+    conn.commit()
+    if cursor.rowcount == 0:
+        return False
+    user_store.replace(user_id, name, city, dob, profile_text, _interests_json(interests))
+    response_cache.invalidate(*cache_tags([user_id]))
+    return True
+
+def delete_user(user_id):
+    conn = get_sqlite_writer()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM users WHERE UserID = ?", (user_id,))
+    conn.commit()
+    tags = cache_tags([user_id])  # While the user still has a row and a community
+    row = get_user_store().remove(user_id)
+    if row is not None and _artifacts.community_index.loaded:
+        _artifacts.community_index.get().remove(row)
+    response_cache.invalidate(*tags)
+    return cursor.rowcount > 0
+
+def save_faiss_index(artifacts=None):
+    artifacts = artifacts or _artifacts
+    with index_lock.read():
+        save_index(artifacts.faiss_index.get(), artifacts.faiss_index_path, artifacts.index_state["embedding_rows"])
@@ -0,0 +1,197 @@
+import os
+import threading
+import numpy as np
+
+
+class EmbeddingStore:
+    """embeddings.npy plus an append-only delta log of vectors added since.
+
+    Every row carries the UserID it belongs to (persisted as
+    vector_ids.npy), and `row_of(user_id)` points at the user's latest
+    vector, so row order is free to change between checkpoints.
+
+    Indexing by row behaves like the old ndarray (`len(store)`, `store[i]`,
+    `store[rows]`, `store[a:b]`). New vectors are fsync'd to
+    `<path>.delta` (an int64 start row, then int64 UserID + float32 vector
+    records) and replayed on the next load; `checkpoint()` folds them into
+    the .npy files (written to a new inode, so live mmaps stay valid).
+
+    `read_only=True` never touches the files (a process that isn't the
+    writer may load them while the writer appends).
+    """
+
+    def __init__(self, path, ids_path, default_ids=None, mmap=False, read_only=False):
+        self.path = path
+        self.ids_path = ids_path
+        self.delta_path = path + ".delta"
+        self._lock = threading.Lock()
+
+        # mmap keeps the bulk of the vectors in the shared page cache
+        self._base = np.load(path, mmap_mode='r' if mmap else None).astype('float32', copy=False)
+        self.dim = self._base.shape[1]
+        self._extra = np.empty((0, self.dim), dtype='float32')
+        self._extra_size = 0
+
+        # 🔑 Row -> UserID. Older builds had none: rows were positional, so the
+        # caller passes the UserIDs of the first len(embeddings) users.
+        if os.path.exists(ids_path):
+            base_ids = np.load(ids_path).astype(np.int64)[:len(self._base)]
+        else:
+            base_ids = np.asarray(default_ids if default_ids is not None else [], dtype=np.int64)
+            base_ids = np.concatenate([base_ids, np.full(max(0, len(self._base) - len(base_ids)), -1)])
+            base_ids = base_ids[:len(self._base)].astype(np.int64)
+            if not read_only:
+                np.save(ids_path, base_ids)
+        self._ids = np.full(len(self._base) + 1024, -1, dtype=np.int64)
+        self._ids[:len(base_ids)] = base_ids
+        self._row_by_id = {}
+        self._index_rows(0, len(base_ids))
+
+        # 🔁 Replay vectors appended after the last checkpoint. The log starts
+        # with the .npy row count it extends, so rows already folded in by a
+        # checkpoint that crashed before clearing the log are skipped.
+        self._file_rows = len(self._base)
+        record_size = 8 + self.dim * 4
+        if os.path.exists(self.delta_path) and os.path.getsize(self.delta_path) >= 8:
+            raw = np.fromfile(self.delta_path, dtype=np.uint8)
+            log_start = int(raw[:8].view(np.int64)[0])
+            whole_records = (len(raw) - 8) // record_size
+            if 8 + whole_records * record_size != len(raw) and not read_only:
+                # Drop a torn trailing record from a crash mid-write (a reader just skips it)
+                with open(self.delta_path, "r+b") as f:
+                    f.truncate(8 + whole_records * record_size)
+            records = raw[8:8 + whole_records * record_size].reshape(-1, record_size)
+            records = records[max(0, len(self._base) - log_start):]
+            ids = records[:, :8].copy().view(np.int64).ravel()
+            vectors = records[:, 8:].copy().view('float32')
+            self._append_to_memory(vectors, ids)
+        self._persisted = len(self)
+
+    def __len__(self):
+        return len(self._base) + self._extra_size
+
+    @property
+    def shape(self):
+        return (len(self), self.dim)
+
+    @property
+    def ids(self):
+        return self._ids[:len(self)]
+
+    def __getitem__(self, key):
+        n_base = len(self._base)
+        if isinstance(key, (int, np.integer)):
+            key = int(key)
+            if key < 0:
+                key += len(self)
+            if key < n_base:
+                return self._base[key]
+            if key - n_base >= self._extra_size:
+                raise IndexError(f"embedding row {key} out of range")
+            return self._extra[key - n_base]
+
+        if isinstance(key, slice):
+            rows = np.arange(len(self))[key]
+        else:
+            rows = np.asarray(key)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+        rows = rows.astype(np.int64, copy=False)
+
+        if len(rows) and rows.max() < n_base:
+            return self._base[rows]
+        out = np.empty((len(rows), self.dim), dtype='float32')
+        in_base = rows < n_base
+        out[in_base] = self._base[rows[in_base]]
+        out[~in_base] = self._extra[:self._extra_size][rows[~in_base] - n_base]
+        return out
+
+    def exact(self, key):
+        # Float32 rows (what rescoring and anything written back out reads); same as store[key]
+        return self[key]
+
+    # --- UserID lookups ---
+
+    def row_of(self, user_id):
+        return self._row_by_id.get(int(user_id))
+
+    def rows_of(self, user_ids):
+        # -1 where the user has no vector
+        get = self._row_by_id.get
+        return np.fromiter((get(int(user_id), -1) for user_id in user_ids), dtype=np.int64, count=len(user_ids))
+
+    def vector_of(self, user_id):
+        row = self.row_of(user_id)
+        return self.exact(row) if row is not None else None
+
+    def live_rows(self):
+        # Latest row of every UserID that still has a vector
+        return np.fromiter(self._row_by_id.values(), dtype=np.int64, count=len(self._row_by_id))
+
+    def forget(self, user_id):
+        # Deleted users keep their (now unreachable) row until the next rebuild
+        with self._lock:
+            return self._row_by_id.pop(int(user_id), None)
+
+    def _index_rows(self, start, stop):
+        for row in range(start, stop):
+            user_id = int(self._ids[row])
+            if user_id >= 0:
+                self._row_by_id[user_id] = row  # Later rows (updates) win
+
+    # --- Appending ---
+
+    def append(self, vectors, user_ids):
+        # Returns the row positions of the new vectors
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype='float32')
+        user_ids = np.asarray(user_ids, dtype=np.int64).reshape(-1)
+        records = np.empty((len(vectors), 8 + self.dim * 4), dtype=np.uint8)
+        records[:, :8] = user_ids.reshape(-1, 1).view(np.uint8)
+        records[:, 8:] = vectors.view(np.uint8)
+        with self._lock:
+            with open(self.delta_path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(np.int64(self._file_rows).tobytes())
+                f.write(records.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            start = len(self)
+            self._append_to_memory(vectors, user_ids)
+            return np.arange(start, len(self))
+
+    def _append_to_memory(self, vectors, user_ids):
+        start = len(self)
+        needed = self._extra_size + len(vectors)
+        if needed > len(self._extra):
+            grown = np.empty((max(needed, 2 * len(self._extra), 1024), self.dim), dtype='float32')
+            grown[:self._extra_size] = self._extra[:self._extra_size]
+            self._extra = grown
+        if start + len(vectors) > len(self._ids):
+            grown_ids = np.full(max(start + len(vectors), 2 * len(self._ids)), -1, dtype=np.int64)
+            grown_ids[:start] = self._ids[:start]
+            self._ids = grown_ids
+        self._extra[self._extra_size:needed] = vectors
+        self._ids[start:start + len(vectors)] = user_ids
+        self._extra_size = needed
+        self._index_rows(start, start + len(vectors))
+
+    def checkpoint(self, chunk_size=65536):
+        # Rewrite the .npy files with every row, then clear the delta log
+        with self._lock:
+            total = len(self)
+            if total == self._persisted:
+                return
+            tmp_path = self.path + ".tmp.npy"
+            out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype='float32', shape=(total, self.dim))
+            for start in range(0, total, chunk_size):
+                out[start:start + chunk_size] = self.exact(slice(start, min(total, start + chunk_size)))
+            out.flush()
+            del out
+            tmp_ids_path = self.ids_path + ".tmp.npy"
+            np.save(tmp_ids_path, self.ids)
+            # ids first: a crash in between leaves extra ids, which load trims
+            os.replace(tmp_ids_path, self.ids_path)
+            os.replace(tmp_path, self.path)
+            open(self.delta_path, "wb").close()
+            self._file_rows = total
+            self._persisted = total
@@ -0,0 +1,180 @@
+import ast
+import logging
+import threading
+from datetime import datetime
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def calculate_age(dob_str):
+    try:
+        dob = datetime.strptime(dob_str, "%Y-%m-%d")
+        today = datetime.today()
+        return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+    except Exception as e:
+        logger.debug("dob_parse_error dob=%r error=%s", dob_str, e)
+        return 0
+
+
+def parse_interest_list(value):
+    # Cleaned_Interests is stored as a Python list literal, e.g. "['Music', 'Art']"
+    if not isinstance(value, str):
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return list(parsed) if isinstance(parsed, (list, tuple, set)) else []
+
+
+def popcount_rows(words):
+    # (n, w) uint64 -> (n,) number of set bits per row
+    return _POPCOUNT8[words.view(np.uint8)].reshape(len(words), -1).sum(axis=1, dtype=np.int64)
+
+
+class FeatureTable:
+    """Per-user friendship features held in contiguous, row-aligned arrays.
+
+    Interests are integer-coded (CSR `indptr`/`indices` plus a packed bitset
+    for fast jaccard), ages are precomputed, and country/gender are
+    category codes with -1 meaning unknown.
+    """
+
+    def __init__(self, initial_capacity=1024):
+        self._lock = threading.Lock()
+        self._size = 0
+        self.interest_codes = {}
+        self.country_codes = {}
+        self.gender_codes = {}
+        self._indptr = np.zeros(initial_capacity + 1, dtype=np.int64)
+        self._indices = np.zeros(initial_capacity * 4, dtype=np.int32)
+        self._bits = np.zeros((initial_capacity, 1), dtype=np.uint64)
+        self._ages = np.zeros(initial_capacity, dtype=np.int32)
+        self._countries = np.full(initial_capacity, -1, dtype=np.int32)
+        self._genders = np.full(initial_capacity, -1, dtype=np.int32)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def ages(self):
+        return self._ages[:self._size]
+
+    @property
+    def countries(self):
+        return self._countries[:self._size]
+
+    @property
+    def genders(self):
+        return self._genders[:self._size]
+
+    @property
+    def interest_bits(self):
+        return self._bits[:self._size]
+
+    def interests_of(self, row):
+        return self._indices[self._indptr[row]:self._indptr[row + 1]]
+
+    # --- Building ---
+
+    def extend_from_dataset(self, df, store=None):
+        # df rows line up with store rows; users missing from the CSV fall back
+        # to the interests stored with them in SQLite
+        for row, (interests, dob, country, gender) in enumerate(zip(
+            df['Cleaned_Interests'], df['DOB'], df['Country'], df['Gender']
+        )):
+            if not isinstance(interests, str) and store is not None and row < len(store):
+                self.append(store.interests_of(row), store.dobs[row])
+            else:
+                self.append(parse_interest_list(interests), dob, country, gender)
+
+    def on_rows_added(self, store, start, stop):
+        # Store rows already covered by the dataset load are skipped
+        for pos in range(max(start, self._size), stop):
+            row = self.append(store.interests_of(pos), store.dobs[pos])
+            previous = store.replaced_from.get(pos)
+            if previous is not None and previous < row:
+                # A profile edit keeps the country/gender the user already had
+                self._countries[row] = self._countries[previous]
+                self._genders[row] = self._genders[previous]
+
+    def append(self, interests, dob, country=None, gender=None):
+        with self._lock:
+            codes = sorted({self._code(self.interest_codes, interest) for interest in interests})
+            row = self._size
+            self._reserve(row + 1, self._indptr[row] + len(codes), len(self.interest_codes))
+
+            start = self._indptr[row]
+            self._indices[start:start + len(codes)] = codes
+            self._indptr[row + 1] = start + len(codes)
+            self._bits[row] = 0
+            for code in codes:
+                self._bits[row, code // 64] |= np.uint64(1) << np.uint64(code % 64)
+
+            self._ages[row] = calculate_age(dob)
+            self._countries[row] = self._category(self.country_codes, country)
+            self._genders[row] = self._category(self.gender_codes, gender)
+            self._size = row + 1
+            return row
+
+    @staticmethod
+    def _code(codes, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def _category(self, codes, value):
+        if not isinstance(value, str) or not value:
+            return -1  # Unknown never matches, like NaN == NaN in the old pandas checks
+        return self._code(codes, value)
+
+    def _reserve(self, rows, nnz, vocabulary_size):
+        capacity = len(self._ages)
+        if rows > capacity:
+            capacity = max(rows, 2 * capacity)
+            self._indptr = self._grow(self._indptr, capacity + 1, 0)
+            self._ages = self._grow(self._ages, capacity, 0)
+            self._countries = self._grow(self._countries, capacity, -1)
+            self._genders = self._grow(self._genders, capacity, -1)
+        if nnz > len(self._indices):
+            self._indices = self._grow(self._indices, max(nnz, 2 * len(self._indices)), 0)
+
+        words = max(1, (vocabulary_size + 63) // 64)
+        if capacity > len(self._bits) or words > self._bits.shape[1]:
+            bits = np.zeros((capacity, max(words, self._bits.shape[1])), dtype=np.uint64)
+            bits[:self._size, :self._bits.shape[1]] = self._bits[:self._size]
+            self._bits = bits
+
+    @staticmethod
+    def _grow(array, length, fill):
+        grown = np.full(length, fill, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    # --- Scoring ---
+
+    def feature_matrix(self, rows1, rows2):
+        # Columns: jaccard, age_difference, same_country, gender_match
+        rows1 = np.asarray(rows1, dtype=np.int64)
+        rows2 = np.asarray(rows2, dtype=np.int64)
+
+        bits = self.interest_bits
+        a, b = bits[rows1], bits[rows2]
+        common = popcount_rows(a & b)
+        total = popcount_rows(a | b)
+        jaccard_similarity = np.divide(common, total, out=np.zeros(len(rows1)), where=total != 0)
+
+        ages = self.ages
+        age_difference = np.abs(ages[rows1] - ages[rows2])
+
+        countries = self.countries
+        same_country = (countries[rows1] == countries[rows2]) & (countries[rows1] >= 0)
+
+        genders = self.genders
+        gender_match = (genders[rows1] == genders[rows2]) & (genders[rows1] >= 0)
+
+        return np.column_stack([jaccard_similarity, age_difference, same_country, gender_match]).astype(np.float64)
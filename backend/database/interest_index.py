@@ -0,0 +1,45 @@
+import threading
+from array import array
+import numpy as np
+
+
+class InterestIndex:
+    """Inverted interest -> user-row index over the resident UserStore.
+
+    Postings are append-only arrays of row positions in ascending order, so
+    a new user only touches the lists for their own interests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def on_rows_added(self, store, start, stop):
+        with self._lock:
+            for pos in range(start, stop):
+                for interest in set(store.profile_texts[pos].split()):
+                    postings = self._postings.get(interest)
+                    if postings is None:
+                        postings = self._postings[interest] = array('q')
+                    postings.append(pos)
+            self._size = max(self._size, stop)
+
+    def count(self, interest):
+        postings = self._postings.get(interest)
+        return len(postings) if postings is not None else 0
+
+    def rows(self, interests):
+        # Sorted rows holding ANY of the interests (same rule as the old `any(...)` check).
+        # Each posting list is already ascending, so this costs the matching rows, not N
+        with self._lock:
+            postings = [np.array(self._postings[interest], dtype=np.int64)
+                        for interest in set(interests) if self._postings.get(interest)]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        if len(postings) == 1:
+            return postings[0]
+        return np.unique(np.concatenate(postings))
@@ -0,0 +1,81 @@
+import json
+import os
+import numpy as np
+
+# Precomputed top-K neighbours (scripts/precompute_neighbors.py), stored as
+# three row-aligned .npy files next to a JSON meta file:
+#   <prefix>.users.npy      (n,)   query UserIDs, sorted ascending
+#   <prefix>.ids.npy        (n, k) neighbour UserIDs, nearest first (-1 = none)
+#   <prefix>.distances.npy  (n, k) index distances, same order
+# `embedding_rows` in the meta is the embedding row count the job searched;
+# a user whose latest vector row is at or past it was added or re-embedded
+# since, so their entry (if any) is stale.
+
+SUFFIXES = ("users", "ids", "distances")
+
+
+def table_paths(prefix):
+    return {name: f"{prefix}.{name}.npy" for name in SUFFIXES}, prefix + ".json"
+
+
+def meta_mtime(prefix):
+    # Changes whenever publish_neighbor_table() swaps in a new table
+    try:
+        return os.path.getmtime(prefix + ".json")
+    except OSError:
+        return None
+
+
+class NeighborTable:
+    def __init__(self, prefix, mmap=True):
+        paths, meta_path = table_paths(prefix)
+        self.mtime = meta_mtime(prefix)
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+        mode = 'r' if mmap else None
+        self._users = np.load(paths["users"], mmap_mode=mode)
+        self._ids = np.load(paths["ids"], mmap_mode=mode)
+        self._distances = np.load(paths["distances"], mmap_mode=mode)
+        self.k = self._ids.shape[1]
+        self.embedding_rows = int(self.meta["embedding_rows"])
+
+    def __len__(self):
+        return len(self._users)
+
+    def lookup(self, user_id):
+        # (UserIDs, distances) nearest first, or None if the user isn't in the table
+        pos = int(np.searchsorted(self._users, user_id))
+        if pos >= len(self._users) or self._users[pos] != user_id:
+            return None
+        ids = np.asarray(self._ids[pos])
+        valid = ids >= 0
+        return ids[valid], np.asarray(self._distances[pos])[valid]
+
+
+def load_neighbor_table(prefix, mmap=True):
+    _, meta_path = table_paths(prefix)
+    if not os.path.exists(meta_path):
+        return None  # Job hasn't run yet; every request uses live search
+    return NeighborTable(prefix, mmap)
+
+
+def create_neighbor_table(prefix, n_users, k):
+    # Writable memmaps to fill in place (RAM stays bounded for large tables);
+    # publish_neighbor_table() swaps them in
+    paths, _ = table_paths(prefix)
+    shapes = {"users": ((n_users,), np.int64), "ids": ((n_users, k), np.int64),
+              "distances": ((n_users, k), np.float32)}
+    return tuple(
+        np.lib.format.open_memmap(paths[name] + ".tmp.npy", mode="w+", dtype=shapes[name][1], shape=shapes[name][0])
+        for name in SUFFIXES
+    )
+
+
+def publish_neighbor_table(prefix, meta):
+    # Arrays first, meta last, so readers that see the new meta see complete arrays
+    paths, meta_path = table_paths(prefix)
+    for name in SUFFIXES:
+        os.replace(paths[name] + ".tmp.npy", paths[name])
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
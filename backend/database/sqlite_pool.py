@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import threading
+from urllib.parse import quote
+
+
+class SQLiteConnections:
+    """Per-thread SQLite connections to one database file.
+
+    Each thread gets its own read-only connection for queries and its own
+    read-write connection for inserts/updates/deletes, so no cursor or
+    transaction state is ever shared between threads. The database runs
+    in WAL mode: readers don't block the writer (or each other), and
+    writers from other threads/processes (the Streamlit app) wait up to
+    `busy_timeout_ms` instead of failing. Long-lived connections keep
+    sqlite3's per-connection prepared-statement cache warm.
+    """
+
+    def __init__(self, path, busy_timeout_ms=5000, cached_statements=256):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._wal_lock = threading.Lock()
+        self._wal_ready = False
+
+    def reader(self):
+        # Read-only: query paths can't write by accident, and never take the write lock
+        self._ensure_wal()
+        return self._get("reader", readonly=True)
+
+    def writer(self):
+        return self._get("writer", readonly=False)
+
+    def _get(self, name, readonly):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            # Connections must not cross a fork (e.g. a preloading server)
+            local.pid = os.getpid()
+            local.reader = local.writer = None
+        conn = getattr(local, name)
+        if conn is None:
+            conn = self._connect(readonly)
+            setattr(local, name, conn)
+        return conn
+
+    def _connect(self, readonly):
+        timeout = self.busy_timeout_ms / 1000
+        if readonly:
+            conn = sqlite3.connect(f"file:{quote(os.path.abspath(self.path))}?mode=ro", uri=True,
+                                   timeout=timeout, cached_statements=self.cached_statements)
+        else:
+            conn = sqlite3.connect(self.path, timeout=timeout, cached_statements=self.cached_statements)
+            conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; safe with WAL
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _ensure_wal(self):
+        # journal_mode is stored in the file, but only a writable connection can set it
+        if self._wal_ready:
+            return
+        with self._wal_lock:
+            if not self._wal_ready:
+                self.writer().execute("PRAGMA journal_mode=WAL")
+                self._wal_ready = True
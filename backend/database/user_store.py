@@ -0,0 +1,189 @@
+import json
+import threading
+import numpy as np
+
+USER_COLUMNS = "id, UserID, Name, City, DOB, Profile_Text, Interests"
+# Databases migrated before the Interests column existed
+LEGACY_USER_COLUMNS = "id, UserID, Name, City, DOB, Profile_Text, NULL"
+
+
+def has_interests_column(conn):
+    return any(column[1] == "Interests" for column in conn.execute("PRAGMA table_info(users)"))
+
+
+def add_interests_column(conn):
+    # Interests: JSON list of the user's interest phrases (Profile_Text joins them with spaces)
+    if not has_interests_column(conn):
+        with conn:
+            conn.execute("ALTER TABLE users ADD COLUMN Interests TEXT")
+
+
+class UserStore:
+    """Resident, column-oriented copy of the users table.
+
+    Rows are appended in SQLite insertion order (the `id` column). Callers
+    address users by UserID; a row position is only an internal handle
+    shared with the other row-aligned tables (features, interests,
+    communities). Deleting a user tombstones its row, and editing one
+    appends a fresh row that `replaced_from` links back to the old one.
+    """
+
+    def __init__(self, initial_capacity=1024):
+        self._lock = threading.Lock()
+        self._size = 0
+        self._user_ids = np.full(initial_capacity, -1, dtype=np.int64)
+        self.names = []
+        self.cities = []
+        self.dobs = []
+        self.profile_texts = []
+        self.interests = []  # JSON strings, None where only Profile_Text is known
+        self._columns = USER_COLUMNS
+        self._row_by_user_id = {}
+        self._last_rowid = 0
+        self._listeners = []
+        self.replaced_from = {}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def user_ids(self):
+        return self._user_ids[:self._size]
+
+    # --- Loading ---
+
+    def load(self, conn):
+        with self._lock:
+            self._size = 0
+            self._user_ids[:] = -1
+            self.names, self.cities, self.dobs, self.profile_texts, self.interests = [], [], [], [], []
+            self._columns = USER_COLUMNS if has_interests_column(conn) else LEGACY_USER_COLUMNS
+            self._row_by_user_id = {}
+            self.replaced_from = {}
+            self._last_rowid = 0
+        return self.refresh(conn)
+
+    def refresh(self, conn):
+        # 🔄 Only pull rows inserted since the last load/refresh
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {self._columns} FROM users WHERE id > ? ORDER BY id",
+            (self._last_rowid,)
+        )
+        rows = cursor.fetchall()
+        self.append_rows(rows)
+        return len(rows)
+
+    def subscribe(self, callback):
+        # callback(store, start, stop) runs for every appended row range,
+        # starting with a catch-up call for the rows already loaded
+        with self._lock:
+            self._listeners.append(callback)
+            if self._size:
+                callback(self, 0, self._size)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        with self._lock:
+            start = self._size
+            self._reserve(self._size + len(rows))
+            for rowid, user_id, name, city, dob, profile_text, interests in rows:
+                if rowid <= self._last_rowid:
+                    continue  # Already loaded (e.g. insert raced with a refresh)
+                pos = self._size
+                self._user_ids[pos] = user_id if user_id is not None else -1
+                self.names.append(name)
+                self.cities.append(city)
+                self.dobs.append(dob)
+                self.profile_texts.append(profile_text or "")
+                self.interests.append(interests)
+                if user_id is not None:
+                    self._row_by_user_id[int(user_id)] = pos
+                self._last_rowid = rowid
+                self._size = pos + 1
+            if self._size > start:
+                for callback in self._listeners:
+                    callback(self, start, self._size)
+
+    def replace(self, user_id, name, city, dob, profile_text, interests=None):
+        # Profile edit: tombstone the old row and append the new version (interests as stored: JSON)
+        with self._lock:
+            old = self._row_by_user_id.get(int(user_id))
+            pos = self._size
+            self._reserve(pos + 1)
+            self._user_ids[pos] = user_id
+            self.names.append(name)
+            self.cities.append(city)
+            self.dobs.append(dob)
+            self.profile_texts.append(profile_text or "")
+            self.interests.append(interests)
+            if old is not None:
+                self._user_ids[old] = -1
+                self.replaced_from[pos] = old
+            self._row_by_user_id[int(user_id)] = pos
+            self._size = pos + 1
+            for callback in self._listeners:
+                callback(self, pos, pos + 1)
+            return pos
+
+    def remove(self, user_id):
+        with self._lock:
+            pos = self._row_by_user_id.pop(int(user_id), None)
+            if pos is not None:
+                self._user_ids[pos] = -1
+            return pos
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._user_ids):
+            return
+        new_capacity = max(capacity, 2 * len(self._user_ids))
+        grown = np.full(new_capacity, -1, dtype=np.int64)
+        grown[:self._size] = self._user_ids[:self._size]
+        self._user_ids = grown
+
+    # --- Lookups ---
+
+    def row(self, pos):
+        # Same tuple shape as fetch_user_by_id: (UserID, Name, City, DOB, Profile_Text).
+        # Rows without a live UserID (deleted, replaced, legacy NULL) are unreachable.
+        if pos < 0 or pos >= self._size:
+            return None
+        user_id = int(self._user_ids[pos])
+        if user_id < 0:
+            return None
+        return (
+            user_id,
+            self.names[pos],
+            self.cities[pos],
+            self.dobs[pos],
+            self.profile_texts[pos],
+        )
+
+    def interests_of(self, pos):
+        # Interest phrases ("Outdoor activities" stays one); rows written without them
+        # (Streamlit inserts, older databases) fall back to the words of Profile_Text
+        interests = self.interests[pos]
+        if interests:
+            try:
+                return list(json.loads(interests))
+            except (ValueError, TypeError):
+                pass
+        return self.profile_texts[pos].split()
+
+    def row_of(self, user_id):
+        return self._row_by_user_id.get(int(user_id))
+
+    def rows_of(self, user_ids):
+        # Vectorized-ish UserID -> row lookup; -1 where the user is unknown
+        get = self._row_by_user_id.get
+        return np.fromiter((get(int(user_id), -1) for user_id in user_ids), dtype=np.int64, count=len(user_ids))
+
+    def get_by_user_id(self, user_id):
+        pos = self.row_of(user_id)
+        return self.row(pos) if pos is not None else None
@@ -0,0 +1,161 @@
+import json
+import os
+import numpy as np
+import faiss
+
+# FAISS labels are real UserIDs (IndexIDMap2), never row positions.
+# `<index>.json` records how many embedding rows the saved index reflects,
+# so rows appended after the last save can be replayed on load, plus the
+# search-time parameters (nprobe, efSearch) scripts/build_index.py chose and
+# the rescore factor of lossy (quantized) index types: those are searched
+# factor times deeper and the shortlist re-ranked against float32 vectors.
+
+
+def id_mapped(index):
+    return isinstance(index, faiss.IndexIDMap)
+
+
+def build_id_mapped_index(template, embeddings, rows, batch_size=65536):
+    # Same index type/training as `template`, refilled with UserID labels
+    inner = faiss.clone_index(template.index if id_mapped(template) else template)
+    inner.reset()
+    index = faiss.IndexIDMap2(inner)
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        index.add_with_ids(embeddings.exact(chunk), embeddings.ids[chunk])
+    return index
+
+
+def indexed_user_ids(index):
+    return faiss.vector_to_array(index.id_map).astype(np.int64)
+
+
+def read_index(path, mmap=False):
+    # Memory-mapped when the index type supports it, regular read otherwise
+    if mmap:
+        try:
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY), True
+        except RuntimeError:
+            pass
+    return faiss.read_index(path), False
+
+
+def writable_copy(index):
+    # mmap'd indexes are read-only; mutations go to an in-memory copy
+    return faiss.clone_index(index)
+
+
+def remove_ids(index, user_ids):
+    # HNSW can't delete: its stale entries stay in the graph and are dropped at
+    # query time (unknown users are skipped, duplicate labels de-duplicated)
+    try:
+        index.remove_ids(np.asarray(user_ids, dtype=np.int64))
+        return True
+    except RuntimeError:
+        return False
+
+
+def read_meta(path):
+    meta_path = path + ".json"
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def apply_search_params(index, params):
+    # e.g. {"nprobe": 16} for IVF, {"efSearch": 64} for HNSW; IDMap wrappers are handled
+    if params:
+        faiss.ParameterSpace().set_index_parameters(
+            index, ",".join(f"{name}={value}" for name, value in params.items())
+        )
+
+
+def load_index(path, embeddings, mmap=False):
+    # Returns (index, changed, mmapped)
+    index, mmapped = read_index(path, mmap)
+    meta = read_meta(path)
+    apply_search_params(index, meta.get("search_params"))
+
+    live_rows = embeddings.live_rows()
+    if not id_mapped(index):
+        # 🔑 Legacy positional index: rebuild it keyed by UserID
+        index = build_id_mapped_index(index, embeddings, np.sort(live_rows))
+        apply_search_params(index, meta.get("search_params"))
+        return index, True, False
+
+    changed = False
+    # 🔁 Vectors appended (new users, profile edits) after the index was saved
+    covered = meta.get("embedding_rows", len(embeddings))
+    replay = np.array([
+        row for row in range(covered, len(embeddings))
+        if embeddings.row_of(embeddings.ids[row]) == row  # Latest vector of a live user
+    ], dtype=np.int64)
+    live_ids = embeddings.ids[live_rows]
+    stale = np.setdiff1d(indexed_user_ids(index), live_ids)
+    if mmapped and (len(replay) or len(stale)):
+        index, mmapped = writable_copy(index), False
+        apply_search_params(index, meta.get("search_params"))
+
+    if len(replay):
+        user_ids = embeddings.ids[replay]
+        remove_ids(index, user_ids)
+        index.add_with_ids(embeddings.exact(replay), user_ids)
+        changed = True
+
+    # 🗑️ Users deleted after the index was saved
+    if len(stale) and remove_ids(index, stale):
+        changed = True
+    return index, changed, mmapped
+
+
+def rescore(embeddings, queries, labels, k, metric_type, chunk_size=256):
+    # Re-rank each query's candidate labels by exact distance to the float32
+    # vectors (embeddings.rows_of / embeddings.exact); keeps k, -1 pads
+    inner_product = metric_type == faiss.METRIC_INNER_PRODUCT
+    worst = -np.inf if inner_product else np.inf
+    distances = np.full((len(queries), k), worst, dtype='float32')
+    out = np.full((len(queries), k), -1, dtype=np.int64)
+    for start in range(0, len(queries), chunk_size):
+        batch_labels = labels[start:start + chunk_size]
+        batch_queries = np.asarray(queries[start:start + chunk_size], dtype='float32')
+        rows = embeddings.rows_of(batch_labels.ravel()).reshape(batch_labels.shape)
+        valid = rows >= 0  # Padding and users deleted since the index was saved
+        vectors = np.asarray(embeddings.exact(np.where(valid, rows, 0).ravel()), dtype='float32')
+        vectors = vectors.reshape(*rows.shape, -1)
+        scores = np.einsum('qcd,qd->qc', vectors, batch_queries)
+        if not inner_product:
+            scores = (np.einsum('qcd,qcd->qc', vectors, vectors) - 2 * scores
+                      + np.einsum('qd,qd->q', batch_queries, batch_queries)[:, None])
+        scores[~valid] = worst
+        order = np.argsort(-scores if inner_product else scores, axis=1, kind='stable')[:, :k]
+        width = order.shape[1]
+        distances[start:start + len(order), :width] = np.take_along_axis(scores, order, axis=1)
+        out[start:start + len(order), :width] = np.where(np.take_along_axis(valid, order, axis=1),
+                                                         np.take_along_axis(batch_labels, order, axis=1), -1)
+    return distances, out
+
+
+def search(index, queries, k, embeddings=None, rescore_factor=1):
+    # index.search, except that with rescore_factor > 1 the top k * factor
+    # labels are re-ranked against the float32 vectors in `embeddings`
+    if rescore_factor <= 1 or embeddings is None:
+        return index.search(queries, k)
+    _, labels = index.search(queries, k * rescore_factor)
+    return rescore(embeddings, queries, labels, k, index.metric_type)
+
+
+def save_index(index, path, embedding_rows, search_params=None, rescore_factor=None):
+    # Write-then-rename so a crash never leaves a half-written index behind
+    meta = read_meta(path)
+    meta["embedding_rows"] = int(embedding_rows)
+    if search_params is not None:
+        meta["search_params"] = search_params
+    if rescore_factor is not None:
+        meta["rescore_factor"] = int(rescore_factor)
+    tmp_path = path + ".tmp"
+    faiss.write_index(index, tmp_path)
+    with open(tmp_path + ".json", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+    os.replace(tmp_path + ".json", path + ".json")
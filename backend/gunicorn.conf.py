@@ -0,0 +1,43 @@
+import os
+import sys
+
+# gunicorn -c gunicorn.conf.py wsgi:app  (from backend/)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config.config import Config  # noqa: E402
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = Config.WEB_WORKERS
+threads = Config.WEB_THREADS
+worker_class = "gthread"
+
+# Every worker would own its own user store, delta log and FAISS index, and their
+# checkpoints would overwrite each other's files (see wsgi.py)
+if Config.WRITES_ENABLED and workers > 1:
+    raise SystemExit(f"WEB_WORKERS={workers} with WRITES_ENABLED: run the write routes in a single-worker "
+                     "process and start the read workers with WRITES_ENABLED=0")
+
+# Read-only workers load artifacts once in the master and fork from it (see wsgi.py).
+# The writer loads in its worker instead: a replacement forked from the master's
+# load-time state would miss the vectors its predecessor appended
+preload_app = not Config.WRITES_ENABLED
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+# Recycled read workers are forked from the preloaded master, so this is cheap
+max_requests = 0 if Config.WRITES_ENABLED else int(os.getenv("WEB_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("ACCESS_LOG")  # e.g. "-" for stdout; off by default
+loglevel = Config.LOG_LEVEL.lower()
+
+# One worker's searches use this many cores, so all workers together use them all once
+omp_threads = Config.FAISS_OMP_THREADS or max(1, (os.cpu_count() or 1) // workers)
+
+
+def post_worker_init(worker):
+    # After wsgi.py has run (in the master with preload_app, in this worker without)
+    import faiss
+    faiss.omp_set_num_threads(omp_threads)
+    # Read by torch when the query encoder first loads in this worker (it loads lazily)
+    os.environ.setdefault("OMP_NUM_THREADS", str(omp_threads))
+    worker.log.info("worker=%s faiss_omp_threads=%d threads=%d writes=%s", worker.pid, omp_threads, threads,
+                    Config.WRITES_ENABLED)
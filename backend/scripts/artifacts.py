@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import numpy as np
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # /backend
+sys.path.insert(0, base_path)
+from config.config import Config  # noqa: E402
+from database.artifacts import (  # noqa: E402
+    OPTIONAL_FILES, REQUIRED_FILES, ArtifactError, active_version, artifact_dir, artifacts_root, list_versions,
+    set_active_version, validate_files, write_manifest
+)
+
+
+def embedding_model(directory):
+    # Model recorded by the embedding pipeline that built embeddings.npy (None for older builds)
+    try:
+        with open(os.path.join(directory, "embeddings.npy.json")) as f:
+            return json.load(f).get("model")
+    except (OSError, ValueError):
+        return None
+
+
+def publish(source, version, link=False):
+    # Copy (or hard-link) a built set of files into artifacts/<version>/ and write its manifest
+    target = artifact_dir(Config.DATA_DIR, version)
+    if os.path.exists(target):
+        raise ArtifactError(f"Version {version} already exists")
+    missing = [name for name in REQUIRED_FILES if not os.path.exists(os.path.join(source, name))]
+    if missing:
+        raise ArtifactError(f"{source} is missing {', '.join(missing)}")
+
+    staging = target + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    for name in REQUIRED_FILES + OPTIONAL_FILES:
+        path = os.path.join(source, name)
+        if not os.path.exists(path):
+            continue
+        os.makedirs(os.path.dirname(os.path.join(staging, name)), exist_ok=True)
+        (os.link if link else shutil.copy2)(path, os.path.join(staging, name))
+    if os.path.exists(os.path.join(source, "embeddings.npy.delta")):
+        print("⚠️ embeddings.npy.delta not published: checkpoint the source first to include those vectors")
+
+    dim = int(np.load(os.path.join(staging, "embeddings.npy"), mmap_mode='r').shape[1])
+    manifest = write_manifest(staging, version, embedding_model=embedding_model(staging), dim=dim, source=source)
+    os.replace(staging, target)  # The version only appears once complete
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish, list and activate versioned serving artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish_parser = commands.add_parser("publish", help="Snapshot built files as a new version")
+    publish_parser.add_argument("--source", default=Config.DATA_DIR,
+                                help="Directory with embeddings.npy, faiss.index, models/")
+    publish_parser.add_argument("--version", default=time.strftime("%Y%m%d-%H%M%S"))
+    publish_parser.add_argument("--link", action="store_true", help="Hard-link instead of copying")
+    publish_parser.add_argument("--activate", action="store_true", help="Make it the active version")
+
+    commands.add_parser("list", help="Show published versions")
+
+    activate_parser = commands.add_parser("activate", help="Point artifacts/CURRENT at a version")
+    activate_parser.add_argument("version")
+    args = parser.parse_args()
+
+    os.makedirs(artifacts_root(Config.DATA_DIR), exist_ok=True)
+    try:
+        if args.command == "publish":
+            started = time.perf_counter()
+            manifest = publish(args.source, args.version, link=args.link)
+            print(f"✅ Published {args.version}: {len(manifest['files'])} files "
+                  f"in {time.perf_counter() - started:.1f}s")
+            if args.activate:
+                set_active_version(Config.DATA_DIR, args.version)
+                print(f"✅ {args.version} is active; running servers switch within ARTIFACT_POLL_SECONDS")
+        elif args.command == "list":
+            active = active_version(Config.DATA_DIR)
+            for manifest in list_versions(Config.DATA_DIR):
+                marker = "*" if manifest["version"] == active else " "
+                print(f"{marker} {manifest['version']:20} {manifest['created_at']}  "
+                      f"{manifest.get('embedding_model', '?')}  dim={manifest.get('dim', '?')}  "
+                      f"{len(manifest['files'])} files")
+        else:
+            validate_files(artifact_dir(Config.DATA_DIR, args.version))
+            set_active_version(Config.DATA_DIR, args.version)
+            print(f"✅ {args.version} is active; running servers switch within ARTIFACT_POLL_SECONDS")
+    except ArtifactError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+import faiss
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from build_index import (  # noqa: E402
+    INDEX_TYPES, METRICS, RESCORE_FACTORS, build_index, index_size_bytes, load_live_vectors, search_params
+)
+from database.vector_index import apply_search_params, search  # noqa: E402
+
+# Each config is "<type>[:key=value,...]"; search params may list several
+# values separated by "/" to sweep operating points on one built index, e.g.
+#   flat  ivf_flat:nlist=1024,nprobe=1/8/32  hnsw:hnsw_m=32,ef_search=16/64/256  sq8:rescore=1/4
+# `rescore` is the float32 re-ranking depth the server would use (default from build_index)
+DEFAULT_CONFIGS = ["flat", "sq_fp16:rescore=1/2", "sq8:rescore=1/4", "ivf_flat:nprobe=1/8/32",
+                   "ivf_pq:nprobe=8/32,rescore=1/4", "hnsw:ef_search=16/64/256"]
+BUILD_KEYS = {"nlist", "pq_m", "pq_nbits", "hnsw_m", "ef_construction", "train_size"}
+SEARCH_KEYS = {"nprobe", "ef_search", "rescore"}
+
+
+class PositionalVectors:
+    """rows_of/exact over a plain array whose index labels are row positions."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def rows_of(self, labels):
+        return np.asarray(labels, dtype=np.int64)
+
+    def exact(self, rows):
+        return self.vectors[rows]
+
+
+def rss_bytes():
+    # Current resident set size of this process (Linux), or None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def parse_config(spec):
+    index_type, _, options = spec.partition(":")
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}' in '{spec}'")
+    build, sweep = {}, {}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        if key in BUILD_KEYS:
+            build[key] = int(value)
+        elif key in SEARCH_KEYS:
+            sweep[key] = [int(v) for v in value.split("/")]
+        else:
+            raise ValueError(f"Unknown option '{key}' in '{spec}'")
+    return index_type, build, sweep
+
+
+def exact_neighbours(vectors, queries, k, metric):
+    index = faiss.IndexFlat(vectors.shape[1], METRICS[metric])
+    index.add(vectors)
+    _, labels = index.search(queries, k)
+    return labels
+
+
+def recall_at_k(found, truth):
+    k = truth.shape[1]
+    return float(np.mean([len(np.intersect1d(f[f >= 0], t)) / k for f, t in zip(found, truth)]))
+
+
+def time_queries(index, queries, k, vectors=None, rescore_factor=1):
+    # One query per call, like /api/recommend, for per-request latency (rescoring included)
+    latencies = np.empty(len(queries))
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        _, labels = search(index, query.reshape(1, -1), k, vectors, rescore_factor)
+        latencies[i] = time.perf_counter() - started
+        found[i] = labels[0]
+    return found, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k vs latency for FAISS index types on embeddings.npy")
+    parser.add_argument("configs", nargs="*", default=DEFAULT_CONFIGS)
+    parser.add_argument("--metric", choices=sorted(METRICS), default="l2")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=1, help="OpenMP threads while timing searches")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    store, rows = load_live_vectors()
+    vectors = np.ascontiguousarray(store[rows], dtype='float32')
+    ids = np.arange(len(vectors), dtype=np.int64)  # Positions, so recall compares like with like
+    query_rows = np.random.default_rng(args.seed).choice(len(vectors), size=min(args.queries, len(vectors)),
+                                                         replace=False)
+    queries = vectors[query_rows]
+    print(f"📦 {len(vectors):,} vectors of dim {vectors.shape[1]} ({vectors.nbytes / 2**20:,.1f} MiB float32), "
+          f"{len(queries):,} queries, k={args.k}")
+
+    truth = exact_neighbours(vectors, queries, args.k, args.metric)
+    positional = PositionalVectors(vectors)
+
+    results = []
+    for spec in args.configs:
+        index_type, build, sweep = parse_config(spec)
+
+        faiss.omp_set_num_threads(os.cpu_count())
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        index = build_index(vectors, ids, index_type, args.metric, **build)
+        build_seconds = time.perf_counter() - started
+        # What the index adds to a serving process: its serialized size and this process's RSS growth
+        size_bytes = index_size_bytes(index)
+        rss_after = rss_bytes()
+        rss_mib = None if rss_before is None else round((rss_after - rss_before) / 2**20, 2)
+        faiss.omp_set_num_threads(args.threads)
+
+        nprobes = sweep.get("nprobe", [16])
+        ef_searches = sweep.get("ef_search", [64])
+        operating_points = {
+            json.dumps(search_params(index_type, nprobe, ef_search), sort_keys=True)
+            for nprobe in nprobes for ef_search in ef_searches
+        }
+        for params in sorted(operating_points):
+            params = json.loads(params)
+            apply_search_params(index, params)
+            for rescore_factor in sweep.get("rescore", [RESCORE_FACTORS.get(index_type, 1)]):
+                found, latencies = time_queries(index, queries, args.k, positional, rescore_factor)
+                result = {
+                    "config": spec,
+                    "type": index_type,
+                    "build_params": build,
+                    "search_params": params,
+                    "rescore_factor": rescore_factor,
+                    f"recall@{args.k}": round(recall_at_k(found, truth), 4),
+                    "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+                    "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3),
+                    "build_seconds": round(build_seconds, 2),
+                    "index_mib": round(size_bytes / 2**20, 2),
+                    "rss_delta_mib": rss_mib,
+                }
+                results.append(result)
+                print(f"{index_type:9} {json.dumps(params):20} rescore=x{rescore_factor} "
+                      f"recall@{args.k}={result[f'recall@{args.k}']:.4f} "
+                      f"p50={result['p50_ms']:.3f}ms p99={result['p99_ms']:.3f}ms build={result['build_seconds']:.1f}s "
+                      f"index={result['index_mib']:.1f}MiB rss+={rss_mib}MiB")
+        del index
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"vectors": len(vectors), "queries": len(queries), "k": args.k, "results": results}, f,
+                      indent=2)
+        print(f"✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import numpy as np
+import faiss
+
+# Reuse the backend's embedding store and index file format
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # /backend
+sys.path.insert(0, base_path)
+from config.config import Config  # noqa: E402
+from database.artifacts import artifact_dir  # noqa: E402
+from database.embedding_store import EmbeddingStore  # noqa: E402
+from database.vector_index import save_index, apply_search_params  # noqa: E402
+
+INDEX_TYPES = ("flat", "sq_fp16", "sq8", "ivf_flat", "ivf_pq", "hnsw")
+METRICS = {"l2": faiss.METRIC_L2, "ip": faiss.METRIC_INNER_PRODUCT}
+# Lossy index types: the server searches this many times deeper and re-ranks the
+# shortlist against the float32 embeddings.npy (memory-mapped, so only those rows are read)
+RESCORE_FACTORS = {"sq_fp16": 2, "sq8": 4, "ivf_pq": 4}
+
+# Files of the artifact version the server loads (the flat DATA_DIR if none is active)
+artifacts_path = artifact_dir(Config.DATA_DIR)
+embeddings_path = os.path.join(artifacts_path, "embeddings.npy")
+vector_ids_path = os.path.join(artifacts_path, "vector_ids.npy")
+faiss_index_path = os.path.join(artifacts_path, "faiss.index")
+
+
+def factory_string(index_type, n, dim, nlist=1024, pq_m=16, pq_nbits=8, hnsw_m=32):
+    if index_type == "flat":
+        return "IDMap2,Flat"
+    # Scalar quantizers: 2 (fp16) or 1 (8-bit) bytes per dimension instead of 4
+    if index_type == "sq_fp16":
+        return "IDMap2,SQfp16"
+    if index_type == "sq8":
+        return "IDMap2,SQ8"
+    if index_type == "hnsw":
+        return f"IDMap2,HNSW{hnsw_m}"
+    # Keep ~39+ training points per centroid, as FAISS recommends
+    nlist = max(1, min(nlist, n // 39))
+    if index_type == "ivf_flat":
+        return f"IDMap2,IVF{nlist},Flat"
+    if index_type == "ivf_pq":
+        if dim % pq_m != 0:
+            raise ValueError(f"PQ sub-quantizers ({pq_m}) must divide the dimension ({dim})")
+        return f"IDMap2,IVF{nlist},PQ{pq_m}x{pq_nbits}"
+    raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+
+
+def search_params(index_type, nprobe=16, ef_search=64):
+    if index_type in ("ivf_flat", "ivf_pq"):
+        return {"nprobe": nprobe}
+    if index_type == "hnsw":
+        return {"efSearch": ef_search}
+    return {}
+
+
+def build_index(vectors, user_ids, index_type="flat", metric="l2", nlist=1024, pq_m=16, pq_nbits=8,
+                hnsw_m=32, ef_construction=200, train_size=100000, batch_size=65536, seed=42):
+    n, dim = vectors.shape
+    index = faiss.index_factory(dim, factory_string(index_type, n, dim, nlist, pq_m, pq_nbits, hnsw_m),
+                                METRICS[metric])
+    if index_type == "hnsw":
+        faiss.downcast_index(index.index).hnsw.efConstruction = ef_construction
+
+    if not index.is_trained:
+        sample = np.sort(np.random.default_rng(seed).choice(n, size=min(n, train_size), replace=False))
+        index.train(np.ascontiguousarray(vectors[sample], dtype='float32'))
+
+    for start in range(0, n, batch_size):
+        stop = min(n, start + batch_size)
+        index.add_with_ids(np.ascontiguousarray(vectors[start:stop], dtype='float32'), user_ids[start:stop])
+    return index
+
+
+def index_size_bytes(index):
+    # Serialized size tracks the resident footprint of the codes + structure
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def load_live_vectors():
+    # Latest vector of every user with a UserID (delta log included)
+    default_ids = None
+    if not os.path.exists(vector_ids_path):
+        # Legacy positional build: rows follow SQLite insertion order
+        conn = sqlite3.connect(Config.SQLITE_PATH)
+        default_ids = [row[0] if row[0] is not None else -1
+                       for row in conn.execute("SELECT UserID FROM users ORDER BY id")]
+        conn.close()
+    store = EmbeddingStore(embeddings_path, vector_ids_path, default_ids=default_ids, mmap=True)
+    rows = np.sort(store.live_rows())
+    return store, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build faiss.index (keyed by UserID) from embeddings.npy")
+    parser.add_argument("--type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--metric", choices=sorted(METRICS), default="l2")
+    parser.add_argument("--nlist", type=int, default=1024, help="IVF lists")
+    parser.add_argument("--nprobe", type=int, default=16, help="IVF lists probed per query")
+    parser.add_argument("--pq-m", type=int, default=16, help="PQ sub-quantizers")
+    parser.add_argument("--pq-nbits", type=int, default=8, help="Bits per PQ code")
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW neighbours per node")
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--train-size", type=int, default=100000)
+    parser.add_argument("--rescore-factor", type=int,
+                        help=f"Shortlist depth re-ranked in float32 (default {RESCORE_FACTORS}, else 1)")
+    parser.add_argument("--threads", type=int, default=0, help="OpenMP threads (0 = FAISS default)")
+    parser.add_argument("--output", default=faiss_index_path)
+    args = parser.parse_args()
+
+    if args.threads:
+        faiss.omp_set_num_threads(args.threads)
+
+    store, rows = load_live_vectors()
+    print(f"📦 {len(rows):,} vectors of dim {store.dim}")
+
+    started = time.perf_counter()
+    index = build_index(store[rows], store.ids[rows], args.type, args.metric, args.nlist, args.pq_m,
+                        args.pq_nbits, args.hnsw_m, args.ef_construction, args.train_size)
+    build_seconds = time.perf_counter() - started
+
+    params = search_params(args.type, args.nprobe, args.ef_search)
+    apply_search_params(index, params)
+    rescore_factor = args.rescore_factor or RESCORE_FACTORS.get(args.type, 1)
+    # Every live row is in the index, so the backend has nothing to replay on load
+    save_index(index, args.output, len(store), search_params=params, rescore_factor=rescore_factor)
+
+    float32_mib = len(rows) * store.dim * 4 / 2**20
+    print(f"✅ {args.type} index saved to {args.output} in {build_seconds:.1f}s "
+          f"({index_size_bytes(index) / 2**20:,.1f} MiB vs {float32_mib:,.1f} MiB of float32 vectors, "
+          f"search params {params or 'none'}, rescore x{rescore_factor})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Concurrent load test of the read endpoints, in-process through the Flask test
+# client (default) or against a running server (--url, e.g. gunicorn). Point it
+# at a synthetic data set with SKILLMATCH_DATA_DIR / SKILLMATCH_SQLITE_PATH
+# (see generate_synthetic_data.py). Results are saved as JSON; --baseline
+# compares throughput and p95 with an earlier run.
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # /backend
+sys.path.insert(0, base_path)
+from config.config import Config  # noqa: E402
+
+ENDPOINTS = {
+    "recommend": lambda ids: f"/api/recommend/{ids[0]}",
+    "recommend_rerank": lambda ids: f"/api/recommend/{ids[0]}?mode=rerank",
+    "community": lambda ids: f"/api/community/{ids[0]}?limit=100",
+    "predict_friendship": lambda ids: f"/api/predict_friendship/{ids[0]}/{ids[1]}",
+}
+DEFAULT_ENDPOINTS = ["recommend", "community", "predict_friendship"]
+
+
+def sample_user_ids(n, seed):
+    conn = sqlite3.connect(f"file:{Config.SQLITE_PATH}?mode=ro", uri=True)
+    user_ids = np.array([row[0] for row in conn.execute("SELECT UserID FROM users WHERE UserID IS NOT NULL")])
+    conn.close()
+    if len(user_ids) == 0:
+        raise SystemExit(f"❌ No users in {Config.SQLITE_PATH}")
+    return np.random.default_rng(seed).choice(user_ids, size=(n, 2))
+
+
+class InProcessClient:
+    """One Flask test client per thread around a single app (shared artifacts)."""
+
+    def __init__(self, warmup):
+        from app import create_app
+        from database.db_connection import warmup as load_all
+        self.app = create_app()
+        self._local = threading.local()
+        if warmup:
+            load_all()
+
+    def get(self, path):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.get(path)
+        response.get_data()
+        return response.status_code
+
+
+class HTTPClient:
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def get(self, path):
+        try:
+            with urllib.request.urlopen(self.url + path, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def run_endpoint(client, paths, concurrency):
+    # Latencies (seconds) and statuses of every request, plus the phase's wall time
+    latencies = np.empty(len(paths))
+    statuses = np.empty(len(paths), dtype=np.int64)
+
+    def issue(i):
+        started = time.perf_counter()
+        try:
+            statuses[i] = client.get(paths[i])
+        except Exception:
+            statuses[i] = 0
+        latencies[i] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(issue, range(len(paths))))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def summarize(latencies, statuses, wall_seconds):
+    ms = latencies * 1000
+    return {
+        "requests": len(latencies),
+        "errors": int(np.sum((statuses == 0) | (statuses >= 500))),
+        "throughput_rps": round(len(latencies) / wall_seconds, 2),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=base_path, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"\n📊 vs {baseline_path}")
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        rps_change = (summary["throughput_rps"] / max(before["throughput_rps"], 1e-9) - 1) * 100
+        p95_change = (summary["p95_ms"] / max(before["p95_ms"], 1e-9) - 1) * 100
+        print(f"  {name:20} throughput {rps_change:+6.1f}%   p95 {p95_change:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test of /api/recommend, /api/community and "
+                                                 "/api/predict_friendship")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup-requests", type=int, default=50, help="Untimed requests per endpoint first")
+    parser.add_argument("--url", help="Drive a running server (e.g. http://localhost:5000) instead of the test client")
+    parser.add_argument("--no-warmup", action="store_true", help="Don't preload artifacts (measures cold start)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=f"load_test_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    client = HTTPClient(args.url) if args.url else InProcessClient(warmup=not args.no_warmup)
+    ids = sample_user_ids(args.requests + args.warmup_requests, args.seed)
+    print(f"🚀 {args.requests:,} requests per endpoint, {args.concurrency} concurrent, "
+          f"{'server ' + args.url if args.url else 'in-process test client'}")
+
+    results = {}
+    for name in args.endpoints:
+        paths = [ENDPOINTS[name](pair) for pair in ids.tolist()]
+        run_endpoint(client, paths[:args.warmup_requests], args.concurrency)
+        latencies, statuses, wall_seconds = run_endpoint(client, paths[args.warmup_requests:], args.concurrency)
+        results[name] = summarize(latencies, statuses, wall_seconds)
+        r = results[name]
+        print(f"  {name:20} {r['throughput_rps']:9,.1f} req/s   p50 {r['p50_ms']:8.2f} ms   "
+              f"p95 {r['p95_ms']:8.2f} ms   p99 {r['p99_ms']:8.2f} ms   errors {r['errors']}")
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "target": args.url or "test_client",
+        "data_dir": Config.DATA_DIR,
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+                   "warmup_requests": args.warmup_requests, "cpu_count": os.cpu_count(),
+                   "cache_enabled": Config.CACHE_ENABLED},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Saved {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,109 @@
-import pandas as pd
-import sqlite3
-
-# Load your CSV
+import ast
+import json
 import os
+import sqlite3
+import time
+import pandas as pd
 
 # Auto-detect correct path
 base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Go one folder back to /backend
 dataset_path = os.path.join(base_path, "processed_dataset.csv")
+db_path = os.path.join(base_path, "database", "skillmatch.db")  # Where db_connection.py reads it from
+
+CHUNK_SIZE = int(os.getenv("MIGRATION_CHUNK_SIZE", "50000"))
+COLUMNS = ['UserID', 'Name', 'City', 'DOB', 'Profile_Text', 'Cleaned_Interests']
+
+UPSERT_SQL = '''
+    INSERT INTO users (UserID, Name, City, DOB, Profile_Text, Interests)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(UserID) DO UPDATE SET
+        Name = excluded.Name,
+        City = excluded.City,
+        DOB = excluded.DOB,
+        Profile_Text = excluded.Profile_Text,
+        Interests = excluded.Interests
+'''
+
+def prepare_schema(conn):
+    # Create users table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            UserID INTEGER,
+            Name TEXT,
+            City TEXT,
+            DOB TEXT,
+            Profile_Text TEXT,
+            Interests TEXT
+        )
+    ''')
+    # Interests (JSON list of phrases) was added later; older databases lack it
+    if not any(column[1] == "Interests" for column in conn.execute("PRAGMA table_info(users)")):
+        conn.execute("ALTER TABLE users ADD COLUMN Interests TEXT")
+    with conn:
+        # Rows the Streamlit app inserted without a UserID get one past the current max
+        conn.execute('''
+            UPDATE users SET UserID = (SELECT COALESCE(MAX(UserID), 0) FROM users) + id
+            WHERE UserID IS NULL
+        ''')
+        # Older runs inserted every row again; keep the first copy so UserID can be unique
+        conn.execute('''
+            DELETE FROM users
+            WHERE UserID IS NOT NULL
+              AND id NOT IN (SELECT MIN(id) FROM users WHERE UserID IS NOT NULL GROUP BY UserID)
+        ''')
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_userid ON users(UserID)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_users_city ON users(City)")
+
+def interests_json(cleaned_interests):
+    # "['Outdoor activities', 'Pets']" (Python literal) -> '["Outdoor activities", "Pets"]'
+    if not isinstance(cleaned_interests, str):
+        return None
+    try:
+        return json.dumps(list(ast.literal_eval(cleaned_interests)))
+    except (ValueError, SyntaxError, TypeError):
+        return None
+
+def iter_rows(chunk):
+    for user_id, name, city, dob, profile_text, cleaned_interests in chunk.itertuples(index=False, name=None):
+        yield (
+            int(user_id),
+            None if pd.isna(name) else name,
+            None if pd.isna(city) else city,
+            None if pd.isna(dob) else dob,
+            None if pd.isna(profile_text) else profile_text,
+            interests_json(cleaned_interests),
+        )
+
+def migrate(dataset_path=dataset_path, db_path=db_path, chunk_size=CHUNK_SIZE):
+    conn = sqlite3.connect(db_path)
+    # ⚡ Bulk-load settings: WAL so readers aren't blocked, one fsync per batch
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-200000")  # ~200 MB page cache
+
+    prepare_schema(conn)
+
+    started = time.perf_counter()
+    total_rows = 0
+    # Stream the CSV so memory stays at one chunk; one transaction per chunk
+    for chunk in pd.read_csv(dataset_path, usecols=COLUMNS, chunksize=chunk_size):
+        chunk = chunk[COLUMNS].dropna(subset=['UserID'])
+        with conn:
+            conn.executemany(UPSERT_SQL, iter_rows(chunk))
+        total_rows += len(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"  ... {total_rows:,} rows ({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+
+    conn.execute("ANALYZE users")
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Database created and data migrated successfully! "
+          f"{total_rows:,} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    return total_rows
+
 
-df = pd.read_csv(dataset_path)
-
-
-# Connect to SQLite (creates new file if not exists)
-conn = sqlite3.connect('skillmatch.db')
-cursor = conn.cursor()
-
-# Create users table
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        UserID INTEGER,
-        Name TEXT,
-        City TEXT,
-        DOB TEXT,
-        Profile_Text TEXT
-    )
-''')
-
-# Insert data
-for _, row in df.iterrows():
-    cursor.execute('''
-        INSERT INTO users (UserID, Name, City, DOB, Profile_Text)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (row['UserID'], row['Name'], row['City'], row['DOB'], row['Profile_Text']))
-
-# Commit and close
-conn.commit()
-conn.close()
-
-print("✅ Database created and data migrated successfully!")
+if __name__ == "__main__":
+    migrate()
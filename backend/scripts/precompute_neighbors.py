@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import faiss
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from build_index import faiss_index_path, load_live_vectors  # noqa: E402
+from config.config import Config  # noqa: E402
+from database.artifacts import artifact_dir  # noqa: E402
+from database.neighbor_table import create_neighbor_table, publish_neighbor_table  # noqa: E402
+from database.vector_index import load_index, read_meta, search  # noqa: E402
+
+neighbor_table_path = os.path.join(artifact_dir(Config.DATA_DIR), "neighbors")
+
+
+def drop_self(labels, distances, query_ids, k):
+    # Move each query's own label to the end (stable, so distance order holds), keep k
+    is_self = labels == query_ids[:, None]
+    order = np.argsort(is_self, axis=1, kind='stable')[:, :k]
+    labels = np.take_along_axis(labels, order, axis=1)
+    distances = np.take_along_axis(distances, order, axis=1)
+    labels[np.take_along_axis(is_self, order, axis=1)] = -1
+    return labels, distances
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute every user's top-K neighbours for /api/recommend")
+    parser.add_argument("--k", type=int, default=50, help="Neighbours stored per user (max top_n served)")
+    parser.add_argument("--batch-size", type=int, default=4096, help="Queries per FAISS search call")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="OpenMP threads per search")
+    parser.add_argument("--output", default=neighbor_table_path, help="Table path prefix")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+
+    store, rows = load_live_vectors()
+    index, _, _ = load_index(faiss_index_path, store, mmap=True)
+    rescore_factor = int(read_meta(faiss_index_path).get("rescore_factor", 1))  # Same results as the server
+    # Sorted by UserID so the server finds a user's entry by binary search
+    rows = rows[np.argsort(store.ids[rows], kind='stable')]
+    print(f"📦 {len(rows):,} users, k={args.k}, {args.threads} threads")
+
+    users, ids, distances = create_neighbor_table(args.output, len(rows), args.k)
+    started = time.perf_counter()
+    for start in range(0, len(rows), args.batch_size):
+        batch = rows[start:start + args.batch_size]
+        query_ids = store.ids[batch]
+        # One call per batch: FAISS spreads the queries across the OpenMP threads
+        batch_distances, labels = search(index, np.ascontiguousarray(store[batch], dtype='float32'), args.k + 1,
+                                         store, rescore_factor)
+        labels, batch_distances = drop_self(labels, batch_distances, query_ids, args.k)
+
+        stop = start + len(batch)
+        users[start:stop] = query_ids
+        ids[start:stop] = labels
+        distances[start:stop] = batch_distances
+        elapsed = time.perf_counter() - started
+        print(f"  ... {stop:,}/{len(rows):,} users ({stop / max(elapsed, 1e-9):,.0f} users/sec)")
+
+    for array in (users, ids, distances):
+        array.flush()
+    del users, ids, distances
+
+    elapsed = time.perf_counter() - started
+    publish_neighbor_table(args.output, {
+        "k": args.k,
+        "users": int(len(rows)),
+        "embedding_rows": int(len(store)),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds": round(elapsed, 1),
+    })
+    print(f"✅ Neighbour table saved to {args.output}.* in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
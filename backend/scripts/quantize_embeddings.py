@@ -0,0 +1,102 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # /backend
+sys.path.insert(0, base_path)
+from config.config import Config  # noqa: E402
+from database.artifacts import artifact_dir  # noqa: E402
+from quantized_embeddings import QUANTIZATIONS, load_quantized, quantized_paths, save_quantized  # noqa: E402
+
+embeddings_path = os.path.join(artifact_dir(Config.DATA_DIR), "embeddings.npy")
+CHUNK_SIZE = 65536
+
+
+def knn(rows_of, n, queries, k, metric):
+    # Exact top-k over all n rows, streamed in chunks: (queries, k) row numbers
+    best_scores = np.full((len(queries), k), np.inf, dtype=np.float32)
+    best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+    for start in range(0, n, CHUNK_SIZE):
+        chunk = np.asarray(rows_of(slice(start, min(n, start + CHUNK_SIZE))), dtype=np.float32)
+        if metric == "ip":
+            scores = -(queries @ chunk.T)  # Negated so lower is better for both metrics
+        else:
+            scores = (queries * queries).sum(1)[:, None] - 2 * queries @ chunk.T + (chunk * chunk).sum(1)[None, :]
+        scores = np.concatenate([best_scores, scores], axis=1)
+        rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, start + len(chunk)), scores[:, k:].shape)],
+                              axis=1)
+        top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_rows = np.take_along_axis(rows, top, axis=1)
+    order = np.argsort(best_scores, axis=1, kind='stable')
+    return np.take_along_axis(best_rows, order, axis=1)
+
+
+def rescore(vectors, queries, shortlists, k, metric):
+    # Re-rank each shortlist with the float32 vectors, keep k
+    out = np.empty((len(queries), k), dtype=np.int64)
+    for i, (query, shortlist) in enumerate(zip(queries, shortlists)):
+        candidates = np.asarray(vectors[np.sort(shortlist)], dtype=np.float32)
+        scores = -(candidates @ query) if metric == "ip" else ((candidates - query) ** 2).sum(1)
+        out[i] = np.sort(shortlist)[np.argsort(scores, kind='stable')[:k]]
+    return out
+
+
+def recall(found, truth):
+    return float(np.mean([len(np.intersect1d(f, t)) / truth.shape[1] for f, t in zip(found, truth)]))
+
+
+def reconstruction_error(vectors, compact):
+    abs_error_sum, max_abs_error, cosine_sum = 0.0, 0.0, 0.0
+    for start in range(0, len(vectors), CHUNK_SIZE):
+        original = np.asarray(vectors[start:start + CHUNK_SIZE], dtype=np.float32)
+        restored = compact[start:start + CHUNK_SIZE]
+        error = np.abs(original - restored)
+        abs_error_sum += float(error.sum())
+        max_abs_error = max(max_abs_error, float(error.max()))
+        norms = np.linalg.norm(original, axis=1) * np.linalg.norm(restored, axis=1)
+        cosine_sum += float(np.sum((original * restored).sum(1) / np.maximum(norms, 1e-12)))
+    return abs_error_sum / vectors.size, max_abs_error, cosine_sum / len(vectors)
+
+
+def main():
+    # Offline accuracy study; serving memory shrinks through build_index.py --type sq_fp16/sq8 instead
+    parser = argparse.ArgumentParser(description="Write float16/int8 copies of embeddings.npy and report accuracy")
+    parser.add_argument("--type", choices=QUANTIZATIONS + ("all",), default="all")
+    parser.add_argument("--metric", choices=("l2", "ip"), default="l2")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--rescore-factor", type=int, default=4, help="Shortlist = k * factor before exact rescoring")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--input", default=embeddings_path)
+    args = parser.parse_args()
+
+    vectors = np.load(args.input, mmap_mode='r')
+    n, dim = vectors.shape
+    query_rows = np.sort(np.random.default_rng(args.seed).choice(n, size=min(args.queries, n), replace=False))
+    queries = np.asarray(vectors[query_rows], dtype=np.float32)
+    print(f"📦 {n:,} vectors of dim {dim} ({vectors.nbytes / 2**20:,.1f} MiB float32), {len(queries)} queries")
+
+    truth = knn(lambda key: vectors[key], n, queries, args.k, args.metric)
+
+    for quantization in (QUANTIZATIONS if args.type == "all" else (args.type,)):
+        started = time.perf_counter()
+        save_quantized(args.input, quantization, vectors, chunk_size=CHUNK_SIZE)
+        compact = load_quantized(args.input, quantization, n, mmap=True)
+        seconds = time.perf_counter() - started
+
+        mean_abs, max_abs, cosine = reconstruction_error(vectors, compact)
+        shortlist = knn(compact.__getitem__, n, queries, args.k * args.rescore_factor, args.metric)
+        quantized_recall = recall(shortlist[:, :args.k], truth)
+        rescored_recall = recall(rescore(vectors, queries, shortlist, args.k, args.metric), truth)
+
+        size = sum(os.path.getsize(p) for p in quantized_paths(args.input, quantization) if os.path.exists(p))
+        print(f"✅ {quantization:8} {size / 2**20:,.1f} MiB ({vectors.nbytes / size:.1f}x smaller) "
+              f"in {seconds:.1f}s | mean |err| {mean_abs:.2e}, max |err| {max_abs:.2e}, cosine {cosine:.6f} | "
+              f"recall@{args.k} {quantized_recall:.4f}, rescored x{args.rescore_factor} {rescored_recall:.4f}")
+
+
+if __name__ == "__main__":
+    main()
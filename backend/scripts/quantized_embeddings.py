@@ -0,0 +1,94 @@
+import os
+import numpy as np
+
+# Compact copies of embeddings.npy written by quantize_embeddings.py (offline
+# study only; the server rescores with embeddings.npy and never loads these):
+#   float16: embeddings.float16.npy                       (2x smaller)
+#   int8:    embeddings.int8.npy + embeddings.int8.scales.npy
+#            per-dimension affine codes, x ~= (code + 128) * scale + offset (4x smaller)
+# embeddings.npy stays the float32 source of truth for exact rescoring.
+
+QUANTIZATIONS = ("float16", "int8")
+
+
+def quantized_paths(path, quantization):
+    stem = path[:-4] if path.endswith(".npy") else path
+    return f"{stem}.{quantization}.npy", f"{stem}.{quantization}.scales.npy"
+
+
+def int8_scales(vectors, chunk_size=65536):
+    # (2, dim): per-dimension offset (min) and step so [min, max] spans 256 codes
+    low = np.full(vectors.shape[1], np.inf, dtype=np.float32)
+    high = np.full(vectors.shape[1], -np.inf, dtype=np.float32)
+    for start in range(0, len(vectors), chunk_size):
+        chunk = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+        low = np.minimum(low, chunk.min(axis=0))
+        high = np.maximum(high, chunk.max(axis=0))
+    step = np.maximum(high - low, 1e-12) / 255.0
+    return np.stack([low, step]).astype(np.float32)
+
+
+def quantize(vectors, quantization, scales=None):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if quantization == "float16":
+        return vectors.astype(np.float16)
+    if quantization == "int8":
+        offset, step = scales
+        codes = np.rint((vectors - offset) / step) - 128
+        return np.clip(codes, -128, 127).astype(np.int8)  # Values outside the fitted range saturate
+    raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+
+
+def dequantize(codes, quantization, scales=None):
+    if quantization == "float16":
+        return np.asarray(codes, dtype=np.float32)
+    offset, step = scales
+    return (np.asarray(codes, dtype=np.float32) + 128.0) * step + offset
+
+
+class QuantizedArray:
+    """Read-only (n, dim) view over quantized codes that indexes like a float32 ndarray."""
+
+    def __init__(self, codes, quantization, scales=None):
+        self.codes = codes
+        self.quantization = quantization
+        self.scales = scales
+        self.shape = codes.shape
+        self.nbytes = codes.nbytes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        return dequantize(self.codes[key], self.quantization, self.scales)
+
+
+def load_quantized(path, quantization, expected_rows, mmap=False):
+    # None when the compact copy is missing or older than embeddings.npy
+    codes_path, scales_path = quantized_paths(path, quantization)
+    if not os.path.exists(codes_path):
+        return None
+    codes = np.load(codes_path, mmap_mode='r' if mmap else None)
+    if len(codes) != expected_rows:
+        return None
+    scales = np.load(scales_path) if quantization == "int8" else None
+    return QuantizedArray(codes, quantization, scales)
+
+
+def save_quantized(path, quantization, vectors, scales=None, chunk_size=65536):
+    # Write-then-rename; returns the scales used (fitted on `vectors` for int8 if not given)
+    codes_path, scales_path = quantized_paths(path, quantization)
+    if quantization == "int8" and scales is None:
+        scales = int8_scales(vectors, chunk_size)
+    dtype = np.float16 if quantization == "float16" else np.int8
+    tmp_path = codes_path + ".tmp.npy"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=vectors.shape)
+    for start in range(0, len(vectors), chunk_size):
+        out[start:start + chunk_size] = quantize(vectors[start:start + chunk_size], quantization, scales)
+    out.flush()
+    del out
+    if scales is not None:
+        np.save(scales_path + ".tmp.npy", scales)
+        os.replace(scales_path + ".tmp.npy", scales_path)
+    os.replace(tmp_path, codes_path)
+    return scales
@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+import time
+import numpy as np
+from config.config import Config
+from database.artifacts import (
+    ArtifactError, active_version, artifact_dir, list_versions, set_active_version, validate_files
+)
+from database.db_connection import Artifacts, get_artifacts, get_feature_table
+from services.ingest_service import switch_artifacts
+
+logger = logging.getLogger(__name__)
+
+_status_lock = threading.Lock()
+_status = {"loading": None, "failed": None, "last_error": None, "activated_at": None}
+_last_poll = 0.0
+
+def artifact_status():
+    artifacts = get_artifacts()
+    with _status_lock:
+        status = dict(_status)
+    return {
+        "active": artifacts.version,
+        "directory": artifacts.directory,
+        **status,
+        "versions": [
+            {"version": m.get("version"), "created_at": m.get("created_at"),
+             "embedding_model": m.get("embedding_model"), "files": len(m.get("files", {}))}
+            for m in list_versions(Config.DATA_DIR)
+        ],
+    }
+
+def activate_version(version, persist=True):
+    # Loads `version` in the background and swaps it in once it checks out.
+    # False if another load is still running. persist=True also makes it the
+    # version other workers (and the next start) pick up.
+    if not version or os.sep in version or version.startswith("."):
+        raise ArtifactError(f"Invalid artifact version '{version}'")
+    if not os.path.isdir(artifact_dir(Config.DATA_DIR, version)):
+        raise ArtifactError(f"Unknown artifact version '{version}'")
+    if version == get_artifacts().version:
+        # Already serving it; a second loader would share its delta log
+        if persist:
+            set_active_version(Config.DATA_DIR, version)
+        return True
+    with _status_lock:
+        if _status["loading"] is not None:
+            return False
+        _status["loading"] = version
+    threading.Thread(target=_load_and_swap, args=(version, persist), name="artifact-loader", daemon=True).start()
+    return True
+
+def _load_and_swap(version, persist):
+    error = None
+    try:
+        switch_artifacts(load_version(version))
+        if persist:
+            set_active_version(Config.DATA_DIR, version)
+        logger.info("artifacts_activated version=%s", version)
+    except Exception as e:
+        error = f"{version}: {e}"
+        logger.exception("artifacts_activation_failed version=%s", version)
+    with _status_lock:
+        _status.update(loading=None, failed=version if error else None, last_error=error)
+        if error is None:
+            _status["activated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+def load_version(version):
+    # Fully loaded and checked Artifacts for `version`; raises ArtifactError if unusable
+    directory = artifact_dir(Config.DATA_DIR, version)
+    manifest = validate_files(directory)
+    artifacts = Artifacts(directory, version)
+    for resource in artifacts.resources():
+        resource.get()
+
+    embeddings = artifacts.embeddings.get()
+    faiss_index = artifacts.faiss_index.get()
+    if faiss_index.d != embeddings.dim:
+        raise ArtifactError(f"faiss.index has dimension {faiss_index.d}, embeddings.npy {embeddings.dim}")
+    if manifest.get("dim") not in (None, embeddings.dim):
+        raise ArtifactError(f"Manifest says dimension {manifest['dim']}, embeddings.npy has {embeddings.dim}")
+    live_rows = embeddings.live_rows()
+    if len(live_rows) == 0 or faiss_index.ntotal == 0:
+        raise ArtifactError("No vectors to serve")
+    # One real query through the index and the model before any traffic does
+    _, found = faiss_index.search(embeddings.exact(live_rows[:1]), 1)
+    if found[0, 0] < 0:
+        raise ArtifactError("faiss.index returned no neighbours for a stored vector")
+    if len(get_feature_table()):
+        artifacts.friendship_model.get().predict(np.asarray(get_feature_table().feature_matrix([0], [0])))
+    centroids = artifacts.cluster_centroids.get()
+    if centroids is not None and centroids.shape[1] != embeddings.dim:
+        raise ArtifactError(f"cluster_centroids.npy has dimension {centroids.shape[1]}, "
+                            f"embeddings.npy {embeddings.dim}")
+    return artifacts
+
+def follow_active_version():
+    # Cheap per-request check (at most every ARTIFACT_POLL_SECONDS) so every
+    # worker moves to a version activated through another worker or the CLI
+    global _last_poll
+    now = time.monotonic()
+    if now - _last_poll < Config.ARTIFACT_POLL_SECONDS:
+        return
+    _last_poll = now
+    version = active_version(Config.DATA_DIR)
+    if version is None or version == get_artifacts().version:
+        return
+    with _status_lock:
+        if _status["loading"] is not None or _status["failed"] == version:
+            return  # Don't retry a broken version on every poll
+    activate_version(version, persist=False)
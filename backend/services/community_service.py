@@ -1,17 +1,32 @@
-from database.db_connection import dataset
+from database.db_connection import get_community_index, get_user_store
+from utils.cache import cluster_tag, user_tag
 
-def get_same_community_users(user_id):
-    if user_id >= len(dataset):
-        return []
-    
-    user_cluster = dataset.iloc[user_id]['Interest_Cluster']
-    community_members = dataset[dataset['Interest_Cluster'] == user_cluster]
-    
-    users = []
-    for idx, row in community_members.iterrows():
-        users.append({
-            "user_id": int(row['UserID']),
-            "name": row['Name']
-        })
-    
-    return users
+def _cluster_of(user_id):
+    row = get_user_store().row_of(user_id)
+    return get_community_index().cluster_of(row) if row is not None else -1
+
+def community_cache_tags(user_id):
+    # A community result changes with the user and with any member of their cluster
+    cluster = _cluster_of(user_id)
+    return [user_tag(user_id)] + ([cluster_tag(cluster)] if cluster >= 0 else [])
+
+def get_community_size(user_id):
+    cluster = _cluster_of(user_id)
+    return get_community_index().size(cluster) if cluster >= 0 else 0
+
+def iter_same_community_users(user_id, offset=0, limit=None):
+    cluster = _cluster_of(user_id)
+    if cluster < 0:
+        return
+    user_store = get_user_store()
+    for row in get_community_index().members(cluster, offset, limit):
+        member = user_store.row(int(row))
+        if member is None:
+            continue  # Deleted or edited since the index was built
+        yield {
+            "user_id": member[0],
+            "name": member[1]
+        }
+
+def get_same_community_users(user_id, offset=0, limit=None):
+    return list(iter_same_community_users(user_id, offset, limit))
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+from config.config import Config
+from utils.metrics import timed
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+def get_encoder():
+    # Loaded on first use; must be the model embeddings.npy was built with
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                from sentence_transformers import SentenceTransformer
+                _encoder = SentenceTransformer(Config.EMBEDDING_MODEL)
+    return _encoder
+
+def encode_texts(texts):
+    with timed("encode"):
+        return np.asarray(get_encoder().encode(list(texts)), dtype='float32').reshape(len(texts), -1)
+
+# --- Micro-batched query encoding ---
+
+def normalize_query(text):
+    # Same key for "Music  Art" and "music art" (the model is uncased)
+    return " ".join(text.lower().split())
+
+class MicroBatchEncoder:
+    """Shared query encoder for concurrent requests.
+
+    Requests queue up; one worker thread takes up to `max_batch_size` of
+    them, waiting at most `max_wait_ms` after the first arrives, and runs a
+    single `encode` for the whole batch. Vectors of recently seen queries
+    come from an LRU cache without touching the model.
+    """
+
+    def __init__(self, max_batch_size=64, max_wait_ms=5, cache_size=10000):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending = []
+        self._pending_ready = threading.Condition()
+        self._worker = None
+        self._worker_pid = None
+
+    def encode(self, text):
+        key = normalize_query(text)
+        with self._cache_lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                return vector
+
+        future = Future()
+        with self._pending_ready:
+            self._ensure_worker()
+            self._pending.append((key, future))
+            self._pending_ready.notify()
+        return future.result()
+
+    def _ensure_worker(self):
+        # Started lazily (and again in a forked child, where threads don't survive)
+        if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+            self._worker.start()
+
+    def _next_batch(self):
+        with self._pending_ready:
+            while not self._pending:
+                self._pending_ready.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._pending_ready.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            # Identical queries in one batch are encoded once
+            texts = list(dict.fromkeys(key for key, _ in batch))
+            try:
+                vectors = dict(zip(texts, encode_texts(texts)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            with self._cache_lock:
+                for key, vector in vectors.items():
+                    self._cache[key] = vector
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            for key, future in batch:
+                future.set_result(vectors[key])
+
+query_encoder = MicroBatchEncoder(max_batch_size=Config.ENCODER_MAX_BATCH_SIZE,
+                                  max_wait_ms=Config.ENCODER_MAX_WAIT_MS,
+                                  cache_size=Config.ENCODER_CACHE_SIZE)
+
+def encode_query(text):
+    return query_encoder.encode(text)
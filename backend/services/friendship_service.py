@@ -1,51 +1,86 @@
-from database.db_connection import dataset, friendship_model
-from datetime import datetime
-
-def calculate_age(dob_str):
-    try:
-        dob = datetime.strptime(dob_str, "%Y-%m-%d")
-        today = datetime.today()
-        return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-    except Exception as e:
-        print(f"Date parsing error for DOB '{dob_str}': {e}")
-        return 0
+from database.db_connection import get_feature_table, get_friendship_model, get_user_store, response_cache
+from utils.metrics import timed
+from utils.single_flight import SingleFlight
+import numpy as np
+
+STRONG = "Strong Collaboration Likely"
+WEAK = "Weak Collaboration Likely"
+INVALID = "Invalid users"
+
+# Identical concurrent predictions (same pair, same data version) share one model call
+_in_flight = SingleFlight()
 
 def predict_friendship(user1_id, user2_id):
-    if user1_id >= len(dataset) or user2_id >= len(dataset):
-        return "Invalid users"
+    key = (user1_id, user2_id, response_cache.version())
+    return _in_flight.do(key, lambda: _compute_friendship(user1_id, user2_id))
+
+def _compute_friendship(user1_id, user2_id):
+    user_store = get_user_store()
+    feature_table = get_feature_table()
+    row1 = user_store.row_of(user1_id)
+    row2 = user_store.row_of(user2_id)
+    if row1 is None or row2 is None or row1 >= len(feature_table) or row2 >= len(feature_table):
+        return INVALID
 
-    # Parse interests
-    interests1 = eval(dataset.iloc[user1_id]['Cleaned_Interests'])
-    interests2 = eval(dataset.iloc[user2_id]['Cleaned_Interests'])
+    # 📦 jaccard, age_difference, same_country, gender_match from precomputed columns
+    with timed("feature_build"):
+        X_input = feature_table.feature_matrix([row1], [row2])
 
-    inter1 = set(interests1)
-    inter2 = set(interests2)
+    # 📈 Predict
+    with timed("model_predict"):
+        prediction = get_friendship_model().predict(X_input)
 
-    common = len(inter1.intersection(inter2))
-    total = len(inter1.union(inter2))
-    jaccard_similarity = common / total if total != 0 else 0
+    return STRONG if prediction[0] == 1 else WEAK
 
-    # 💥 Calculate age difference from DOB
-    dob1 = dataset.iloc[user1_id]['DOB']
-    dob2 = dataset.iloc[user2_id]['DOB']
-    age1 = calculate_age(dob1)
-    age2 = calculate_age(dob2)
-    age_difference = abs(age1 - age2)
+# --- Batch scoring ---
 
-    # Same country
-    country1 = dataset.iloc[user1_id]['Country']
-    country2 = dataset.iloc[user2_id]['Country']
-    same_country = 1 if country1 == country2 else 0
+def predict_friendship_batch(pairs):
+    pairs = np.asarray(pairs, dtype=np.int64)
+    if pairs.size == 0:
+        pairs = pairs.reshape(0, 2)
+    if pairs.ndim != 2 or pairs.shape[1] != 2:
+        raise ValueError("pairs must be a list of [user1_id, user2_id]")
+    feature_table = get_feature_table()
+    rows = get_user_store().rows_of(pairs.ravel()).reshape(-1, 2)
+    valid = ((rows >= 0) & (rows < len(feature_table))).all(axis=1)
 
-    # Gender match
-    gender1 = dataset.iloc[user1_id]['Gender']
-    gender2 = dataset.iloc[user2_id]['Gender']
-    gender_match = 1 if gender1 == gender2 else 0
+    results = np.full(len(pairs), INVALID, dtype=object)
+    if valid.any():
+        with timed("feature_build"):
+            X_input = feature_table.feature_matrix(rows[valid, 0], rows[valid, 1])
+        with timed("model_predict"):
+            predictions = get_friendship_model().predict(X_input)  # One model call per batch
+        results[valid] = np.where(predictions == 1, STRONG, WEAK)
 
-    # 📦 Make full input
-    X_input = [[jaccard_similarity, age_difference, same_country, gender_match]]
+    return [
+        {"user1_id": int(user1_id), "user2_id": int(user2_id), "prediction": prediction}
+        for (user1_id, user2_id), prediction in zip(pairs.tolist(), results.tolist())
+    ]
 
-    # 📈 Predict
-    prediction = friendship_model.predict(X_input)
+def predict_friendship_for_candidates(user_id, candidate_ids):
+    candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+    pairs = np.column_stack([np.full(len(candidate_ids), user_id, dtype=np.int64), candidate_ids])
+    return predict_friendship_batch(pairs)
+
+def collaboration_scores(user_id, candidate_ids):
+    # P(strong collaboration) per candidate from one vectorized model call; NaN for unknown users
+    candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+    feature_table = get_feature_table()
+    user_store = get_user_store()
+    user_row = user_store.row_of(user_id)
+    rows = user_store.rows_of(candidate_ids)
+    valid = (rows >= 0) & (rows < len(feature_table))
+    scores = np.full(len(candidate_ids), np.nan)
+    if user_row is None or user_row >= len(feature_table) or not valid.any():
+        return scores
 
-    return "Strong Collaboration Likely" if prediction[0] == 1 else "Weak Collaboration Likely"
+    with timed("feature_build"):
+        X_input = feature_table.feature_matrix(np.full(valid.sum(), user_row), rows[valid])
+    model = get_friendship_model()
+    classes = list(getattr(model, "classes_", []))
+    with timed("model_predict"):
+        if hasattr(model, "predict_proba") and 1 in classes:
+            scores[valid] = model.predict_proba(X_input)[:, classes.index(1)]
+        else:
+            scores[valid] = model.predict(X_input)
+    return scores
@@ -0,0 +1,144 @@
+import threading
+import numpy as np
+from config.config import Config
+from database.db_connection import (
+    cache_tags, current_artifacts, get_writable_faiss_index, get_user_store, get_sqlite_reader, index_lock, insert_user,
+    update_user, delete_user, save_faiss_index, swap_artifacts, response_cache
+)
+from database.vector_index import remove_ids
+from services.encoder_service import encode_texts
+from utils.cache import user_tag
+
+ENCODE_BATCH_SIZE = 256
+
+_ingest_lock = threading.Lock()
+_checkpoint_lock = threading.Lock()
+_ingested_since_checkpoint = 0
+_synced_rows = 0  # Store rows already checked for a vector
+
+def checkpoint():
+    # Fold the delta log into embeddings.npy and rewrite faiss.index (writer process only)
+    if not Config.WRITES_ENABLED or not _checkpoint_lock.acquire(blocking=False):
+        return  # One already running
+    try:
+        artifacts = current_artifacts()  # Same version for both files even if a swap lands meanwhile
+        artifacts.embeddings.get().checkpoint()
+        save_faiss_index(artifacts)
+    finally:
+        _checkpoint_lock.release()
+
+def _index_vectors(vectors, user_ids):
+    # Durable first, then searchable; replaces any vector the users had.
+    # Writes go to the live set, not the calling request's snapshot
+    artifacts = current_artifacts()
+    embeddings = artifacts.embeddings.get()
+    embeddings.append(vectors, user_ids)
+    with index_lock.write():
+        faiss_index = get_writable_faiss_index(artifacts)
+        remove_ids(faiss_index, user_ids)
+        faiss_index.add_with_ids(vectors, user_ids)
+        artifacts.index_state["embedding_rows"] = len(embeddings)
+    _assign_clusters(vectors, user_ids, artifacts)
+    # Their own results and every cached result or community that includes them
+    response_cache.invalidate(*cache_tags(user_ids.tolist(), artifacts))
+
+def _assign_clusters(vectors, user_ids, artifacts):
+    # New users join the nearest KMeans centroid so /community sees them right away
+    centroids = artifacts.cluster_centroids.get()
+    if centroids is None:
+        return
+    rows = get_user_store().rows_of(user_ids)
+    found = rows >= 0
+    artifacts.community_index.get().assign_nearest(rows[found], vectors[found], centroids)
+
+def _maybe_checkpoint(changed):
+    global _ingested_since_checkpoint
+    _ingested_since_checkpoint += changed
+    if _ingested_since_checkpoint >= Config.INDEX_CHECKPOINT_EVERY:
+        _ingested_since_checkpoint = 0
+        threading.Thread(target=checkpoint, daemon=True).start()
+
+def sync_embeddings():
+    # Embed every store row without a vector yet: API sign-ups and rows the
+    # Streamlit app wrote straight to SQLite
+    global _synced_rows
+    with _ingest_lock:
+        user_store = get_user_store()
+        user_store.refresh(get_sqlite_reader())
+        stop = len(user_store)
+        store_ids = user_store.user_ids[_synced_rows:stop]
+        missing = store_ids[(store_ids >= 0) & (current_artifacts().embeddings.get().rows_of(store_ids) < 0)]
+        missing_rows = user_store.rows_of(missing)
+
+        for start in range(0, len(missing), ENCODE_BATCH_SIZE):
+            batch_ids = missing[start:start + ENCODE_BATCH_SIZE]
+            batch_rows = missing_rows[start:start + ENCODE_BATCH_SIZE]
+            vectors = encode_texts([user_store.profile_texts[row] for row in batch_rows])
+            _index_vectors(vectors, batch_ids)
+
+        _synced_rows = stop
+        _maybe_checkpoint(len(missing))
+        return len(missing)
+
+def _user_dict(user):
+    return {
+        "user_id": user[0],
+        "name": user[1],
+        "city": user[2],
+        "dob": user[3],
+        "profile_text": user[4],
+    }
+
+def ingest_user(name, dob, city, profile_text, interests=None):
+    user_id = insert_user(name, dob, city, profile_text, interests=interests)
+    sync_embeddings()
+    return _user_dict(get_user_store().get_by_user_id(user_id))
+
+def edit_user(user_id, name, dob, city, profile_text, interests=None):
+    with _ingest_lock:
+        if not update_user(user_id, name, dob, city, profile_text, interests):
+            return None
+        vectors = encode_texts([profile_text])
+        _index_vectors(vectors, np.array([user_id], dtype=np.int64))
+        _maybe_checkpoint(1)
+    return _user_dict(get_user_store().get_by_user_id(user_id))
+
+def remove_user(user_id):
+    with _ingest_lock:
+        if not delete_user(user_id):
+            return False
+        artifacts = current_artifacts()
+        artifacts.embeddings.get().forget(user_id)
+        with index_lock.write():
+            remove_ids(get_writable_faiss_index(artifacts), [user_id])
+        response_cache.invalidate(user_tag(user_id))
+        _maybe_checkpoint(1)
+    return True
+
+def switch_artifacts(artifacts):
+    # Swap in another artifact version, first copying over the vectors of users
+    # it doesn't have (signed up after it was built) from the live version
+    global _synced_rows
+    if not Config.WRITES_ENABLED:
+        # Read-only: the version's files are served as published, plus any users
+        # the writer added to SQLite meanwhile (they get vectors in a later version)
+        get_user_store().refresh(get_sqlite_reader())
+        swap_artifacts(artifacts)
+        return
+    with _ingest_lock:
+        live, embeddings = current_artifacts().embeddings.get(), artifacts.embeddings.get()
+        store_ids = get_user_store().user_ids
+        missing = store_ids[(store_ids >= 0) & (embeddings.rows_of(store_ids) < 0)]
+        live_rows = live.rows_of(missing)
+        found = live_rows >= 0
+        if found.any() and live.dim == embeddings.dim:
+            vectors = live.exact(live_rows[found])
+            embeddings.append(vectors, missing[found])
+            with index_lock.write():
+                faiss_index = get_writable_faiss_index(artifacts)
+                faiss_index.add_with_ids(vectors, missing[found])
+                artifacts.index_state["embedding_rows"] = len(embeddings)
+            _assign_clusters(vectors, missing[found], artifacts)
+        swap_artifacts(artifacts)
+        _synced_rows = 0  # Anything still missing (e.g. a new model dimension) is re-encoded
+    sync_embeddings()
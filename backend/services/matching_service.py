@@ -1,33 +1,92 @@
-from database.db_connection import embeddings, faiss_index, sqlite_conn
+from database.db_connection import (
+    get_artifacts, get_embeddings, get_faiss_index, get_neighbor_table, get_sqlite_reader, get_user_store,
+    get_interest_index, index_lock, response_cache
+)
+from database.vector_index import search
+from services.encoder_service import encode_query
+from utils.metrics import timed
+from utils.single_flight import SingleFlight
 import numpy as np
-import sqlite3
+import faiss
 
-def fetch_user_by_id(user_id):
-    cursor = sqlite_conn.cursor()
-    cursor.execute("SELECT UserID, Name, City, DOB, Profile_Text FROM users WHERE UserID = ?", (user_id,))
-    return cursor.fetchone()
+# FAISS labels are UserIDs (see database/vector_index.py)
 
-def fetch_all_users():
-    cursor = sqlite_conn.cursor()
-    cursor.execute("SELECT UserID, Name, City, DOB, Profile_Text FROM users")
-    return cursor.fetchall()
+# Rows written since the neighbour table was built that a lookup still merges in
+NEIGHBOR_DELTA_MAX_ROWS = 4096
 
-def get_top_matches(user_id, top_n=5):
-    if user_id >= len(embeddings):
-        return []
+# Identical concurrent requests share one search. The data version is part of
+# the key, so a call arriving after a write never joins a search started before it.
+_in_flight = SingleFlight()
+
+def _search(queries, k):
+    # FAISS search on this request's artifact set. Quantized index types are
+    # searched rescore_factor times deeper and the shortlist re-ranked against
+    # the float32 vectors (see database/vector_index.py)
+    artifacts = get_artifacts()
+    with timed("faiss_search"), index_lock.read():
+        return search(artifacts.faiss_index.get(), queries, k, artifacts.embeddings.get(),
+                      artifacts.index_state["rescore_factor"])
+
+def get_candidate(user_id):
+    # Resident store first; refresh only when the index knows a user the store doesn't
+    if user_id < 0:
+        return None
+    user_store = get_user_store()
+    candidate = user_store.get_by_user_id(user_id)
+    if candidate is None:
+        with timed("sql_fetch"):
+            user_store.refresh(get_sqlite_reader())
+        candidate = user_store.get_by_user_id(user_id)
+    return candidate
 
-    user_embedding = np.array([embeddings[user_id]]).astype('float32')
-    distances, indices = faiss_index.search(user_embedding, top_n + 1)
+def _precomputed_neighbors(user_id, top_n):
+    # Table entry, if the nightly job covered this user's current vector, merged
+    # with the users added or re-embedded since (scored exactly) so new sign-ups
+    # show up before the next run. Past NEIGHBOR_DELTA_MAX_ROWS new rows that
+    # costs more than a live search, so the table is skipped.
+    table = get_neighbor_table()
+    if table is None or top_n > table.k:
+        return None
+    embeddings = get_embeddings()
+    row = embeddings.row_of(user_id)
+    if row is None or row >= table.embedding_rows:
+        return None  # Added or re-embedded since the table was built
+    if len(embeddings) - table.embedding_rows > NEIGHBOR_DELTA_MAX_ROWS:
+        return None
+    entry = table.lookup(user_id)
+    if entry is None or len(embeddings) <= table.embedding_rows:
+        return entry
 
+    # 🔁 Latest vectors of users written since the build
+    delta_rows = np.arange(table.embedding_rows, len(embeddings))
+    delta_ids = embeddings.ids[delta_rows]
+    latest = embeddings.rows_of(delta_ids) == delta_rows
+    delta_ids, delta_rows = delta_ids[latest], delta_rows[latest]
+    if len(delta_ids) == 0:
+        return entry
+    inner_product = get_faiss_index().metric_type == faiss.METRIC_INNER_PRODUCT
+    delta_distances = _score(np.asarray(embeddings.exact(delta_rows), dtype='float32'),
+                             embeddings.exact(row), inner_product)
+
+    # Table neighbours re-embedded since are superseded by their new distance
+    match_ids, distances = entry
+    current = ~np.isin(match_ids, delta_ids)
+    match_ids = np.concatenate([match_ids[current], delta_ids])
+    distances = np.concatenate([distances[current], delta_distances.astype(distances.dtype)])
+    order = _top(distances, len(distances), inner_product)
+    return match_ids[order], distances[order]
+
+def _build_matches(user_id, match_ids, distances, top_n):
     matches = []
-    all_users = fetch_all_users()
+    seen = {user_id}  # Skip self (and stale duplicates left in HNSW after edits)
 
-    for idx, distance in zip(indices[0], distances[0]):
-        if idx == user_id:
-            continue  # Skip self
+    for match_id, distance in zip(match_ids, distances):
+        if match_id in seen:
+            continue
+        seen.add(match_id)
 
-        if idx < len(all_users):
-            candidate = all_users[idx]
+        candidate = get_candidate(match_id)
+        if candidate is not None:
             matches.append({
                 "user_id": candidate[0],
                 "name": candidate[1],
@@ -35,43 +94,172 @@ def get_top_matches(user_id, top_n=5):
                 "profile_text": candidate[4],
                 "similarity_score": round(float(1 - distance), 2)
             })
+            if len(matches) == top_n:
+                break
 
     return matches
 
+def get_top_matches(user_id, top_n=5):
+    key = ("top_matches", user_id, top_n, response_cache.version())
+    return _in_flight.do(key, lambda: _compute_top_matches(user_id, top_n))
+
+def _compute_top_matches(user_id, top_n):
+    # ⚡ Precomputed neighbours: one lookup for users unchanged since the last run
+    precomputed = _precomputed_neighbors(user_id, top_n)
+    if precomputed is not None:
+        matches = _build_matches(user_id, *precomputed, top_n)
+        if len(matches) == top_n:
+            return matches
+        # Too many neighbours deleted since the build; fall through to live search
+
+    user_vector = get_embeddings().vector_of(user_id)
+    if user_vector is None:
+        return []
+
+    user_embedding = np.array([user_vector]).astype('float32')
+    distances, indices = _search(user_embedding, top_n + 1)
+
+    return _build_matches(user_id, indices[0], distances[0], top_n)
+
+def match_text(text, top_n=5):
+    # Free-text / interest query: one shared, micro-batched encoder instead of a model per client
+    query = np.asarray(encode_query(text), dtype='float32').reshape(1, -1)
+    distances, indices = _search(query, top_n)
+    return _build_matches(-1, indices[0], distances[0], top_n)
+
+def ann_candidates(user_id, k):
+    # Up to k nearest (UserIDs, distances), nearest first, without self or duplicates
+    precomputed = _precomputed_neighbors(user_id, k)
+    if precomputed is not None:
+        match_ids, distances = precomputed
+    else:
+        user_vector = get_embeddings().vector_of(user_id)
+        if user_vector is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype='float32')
+        user_embedding = np.array([user_vector]).astype('float32')
+        distances, indices = _search(user_embedding, k + 1)
+        match_ids, distances = indices[0], distances[0]
+
+    keep = (match_ids >= 0) & (match_ids != user_id)
+    match_ids, distances = match_ids[keep], distances[keep]
+    _, first = np.unique(match_ids, return_index=True)
+    first.sort()
+    return match_ids[first][:k], distances[first][:k]
+
+# --- Batch recommendations ---
+
+def iter_batch_top_matches(user_ids, top_n=5, batch_size=1024):
+    # Yields {"user_id", "matches"} per requested user, in request order. Users
+    # covered by the neighbour table are a lookup; the rest share one
+    # matrix-shaped FAISS search per batch instead of one search per user.
+    embeddings = get_embeddings()
+    for start in range(0, len(user_ids), batch_size):
+        batch = [int(user_id) for user_id in user_ids[start:start + batch_size]]
+        results = {}
+
+        live = []
+        for user_id in batch:
+            precomputed = _precomputed_neighbors(user_id, top_n)
+            if precomputed is not None:
+                matches = _build_matches(user_id, *precomputed, top_n)
+                if len(matches) == top_n:
+                    results[user_id] = matches
+                    continue
+            live.append(user_id)
+
+        live = np.asarray(live, dtype=np.int64)
+        rows = embeddings.rows_of(live)
+        for user_id in live[rows < 0]:
+            results[int(user_id)] = []  # No vector: unknown or deleted user
+
+        live, rows = live[rows >= 0], rows[rows >= 0]
+        if len(live):
+            queries = np.ascontiguousarray(embeddings.exact(rows), dtype='float32')
+            distances, indices = _search(queries, top_n + 1)
+            for user_id, match_ids, match_distances in zip(live.tolist(), indices, distances):
+                results[user_id] = _build_matches(user_id, match_ids, match_distances, top_n)
+
+        for user_id in batch:
+            yield {"user_id": user_id, "matches": results[user_id]}
+
+# Candidate sets at or below this size are scored exactly instead of via FAISS
+PREFILTER_MAX_CANDIDATES = 4096
+
+def _score(vectors, query, inner_product):
+    # Higher is better for inner product, lower for L2 (like FAISS distances)
+    if inner_product:
+        return vectors @ query
+    diff = vectors - query
+    return np.einsum('ij,ij->i', diff, diff)
+
+def _top(scores, k, inner_product):
+    return np.argsort(-scores if inner_product else scores, kind='stable')[:k]
+
+def exact_search(query, user_ids, k):
+    # Score only the allowed users, returning what faiss_index.search would
+    embeddings = get_embeddings()
+    rows = embeddings.rows_of(user_ids)
+    has_vector = rows >= 0
+    user_ids, rows = user_ids[has_vector], rows[has_vector]
+
+    inner_product = get_faiss_index().metric_type == faiss.METRIC_INNER_PRODUCT
+    scores = _score(np.asarray(embeddings[rows], dtype='float32'), query[0], inner_product)
+    order = _top(scores, k, inner_product)
+    return scores[order], user_ids[order]
+
+def filtered_search(query, allowed_rows, top_n, exclude=None):
+    # allowed_rows: sorted store rows (InterestIndex.rows); results are (distances, UserIDs)
+    user_store = get_user_store()
+    allowed_ids = user_store.user_ids[allowed_rows]
+    live = (allowed_ids >= 0) & (allowed_ids != (exclude if exclude is not None else -1))
+    allowed_rows, allowed_ids = allowed_rows[live], allowed_ids[live]
+    if len(allowed_ids) == 0:
+        return np.empty(0, dtype='float32'), np.empty(0, dtype=np.int64)
+
+    # 🎯 Selective filter: pre-filter and score the candidates directly
+    if len(allowed_ids) <= PREFILTER_MAX_CANDIDATES:
+        return exact_search(query, allowed_ids, top_n)
+
+    # 🔍 Broad filter: widen the ANN search until top_n allowed hits are found.
+    # Start from the expected depth for this selectivity so most calls need one pass.
+    ntotal = get_faiss_index().ntotal
+    k = min(ntotal, int(np.ceil((top_n + 1) * ntotal / len(allowed_ids) * 1.5)))
+    while True:
+        distances, labels = _search(query, k)
+        # Each hit's store row looked up in the sorted allowed rows: O(k log allowed)
+        rows = user_store.rows_of(labels[0])
+        positions = np.minimum(np.searchsorted(allowed_rows, rows), len(allowed_rows) - 1)
+        keep = allowed_rows[positions] == rows
+        hit_ids, hit_distances = labels[0][keep], distances[0][keep]
+        _, first = np.unique(hit_ids, return_index=True)
+        first.sort()  # Distance order, with stale HNSW duplicates dropped
+        hit_ids, hit_distances = hit_ids[first], hit_distances[first]
+        if len(hit_ids) >= top_n or k >= ntotal:
+            return hit_distances[:top_n], hit_ids[:top_n]
+        k = min(ntotal, k * 2)
+
 def recommend_filtered_users(user_id, selected_interests, top_n=10):
-    try:
-        user = fetch_user_by_id(user_id)
-        if user is None:
-            return f"UserID {user_id} not found."
-    except Exception as e:
-        return str(e)
+    user_vector = get_embeddings().vector_of(user_id)
+    if get_user_store().get_by_user_id(user_id) is None or user_vector is None:
+        return f"UserID {user_id} not found."
 
-    user_embedding = np.array([embeddings[user_id]]).astype('float32')
+    user_embedding = np.array([user_vector]).astype('float32')
 
-    distances, indices = faiss_index.search(user_embedding, top_n * 5)  # Search a bit wider
+    allowed_rows = get_interest_index().rows(selected_interests)
+    distances, match_ids = filtered_search(user_embedding, allowed_rows, top_n, exclude=user_id)
 
     recommended_users = []
-    all_users = fetch_all_users()
-
-    for idx in indices[0]:
-        if idx == user_id:
-            continue  # Skip self
-
-        if idx < len(all_users):
-            candidate = all_users[idx]
-            candidate_interests = candidate[4].split()
-
-        # Check intersection
-        if any(interest in candidate_interests for interest in selected_interests):
-            recommended_users.append({
-                'user_id': candidate[0],
-                'name': candidate[1],
-                'city': candidate[2],
-                'profile_text': candidate[4],
-                'similarity_score': round(float(1 - distances[0][np.where(indices[0]==idx)[0][0]]), 2)
-            })
 
-        if len(recommended_users) >= top_n:
-            break
+    for match_id, distance in zip(match_ids, distances):
+        candidate = get_candidate(match_id)
+        if candidate is None:
+            continue
+        recommended_users.append({
+            'user_id': candidate[0],
+            'name': candidate[1],
+            'city': candidate[2],
+            'profile_text': candidate[4],
+            'similarity_score': round(float(1 - distance), 2)
+        })
 
     return recommended_users
@@ -0,0 +1,115 @@
+import threading
+import time
+import numpy as np
+from config.config import Config
+from database.db_connection import get_feature_table, get_friendship_model
+from services.matching_service import ann_candidates, get_candidate
+from services.friendship_service import collaboration_scores
+
+# Two-stage recommend: a wide ANN candidate set (stage 1), re-ranked by the
+# friendship model's P(strong collaboration) blended with similarity (stage 2).
+# Each stage has a latency budget. Stage 2 scores candidates in chunks, in ANN
+# order, until its deadline passes, and re-ranks the ones it got to; the rest
+# keep ANN order behind them. When stage 1 overruns, or stage 2 can't fit even
+# top_n candidates, results keep pure ANN order.
+
+_cost_lock = threading.Lock()
+_model_seconds_per_candidate = None  # Moving average of warm stage-2 cost
+_last_probe = 0.0
+
+def _affordable_candidates(budget_seconds):
+    # How many candidates stage 2 can score within its budget (all, until measured)
+    with _cost_lock:
+        cost = _model_seconds_per_candidate
+    return None if cost is None else int(budget_seconds / max(cost, 1e-9))
+
+def _record_model_cost(seconds, n_candidates, replace=False):
+    global _model_seconds_per_candidate
+    per_candidate = seconds / max(1, n_candidates)
+    with _cost_lock:
+        if _model_seconds_per_candidate is None or replace:
+            _model_seconds_per_candidate = per_candidate
+        else:
+            _model_seconds_per_candidate = 0.8 * _model_seconds_per_candidate + 0.2 * per_candidate
+
+def _should_probe():
+    # Once every RERANK_PROBE_SECONDS a request scores top_n candidates even
+    # though the estimate says they won't fit; its measurement replaces the
+    # estimate, so one inflated by a slow spell recovers
+    global _last_probe
+    now = time.monotonic()
+    with _cost_lock:
+        if now - _last_probe < Config.RERANK_PROBE_SECONDS:
+            return False
+        _last_probe = now
+        return True
+
+def _score_until(user_id, match_ids, top_n, deadline, probe=False):
+    # Scores match_ids in order, one chunk at a time, until the deadline passes.
+    # The first chunk is at least top_n (exactly top_n for a probe). Returns the
+    # scores (NaN past the last scored candidate) and how many were scored.
+    get_feature_table()
+    get_friendship_model()  # Lazy loads happen here, outside the cost measurements
+    scores = np.full(len(match_ids), np.nan)
+    scored = 0
+    while scored < len(match_ids):
+        affordable = _affordable_candidates(deadline - time.perf_counter())
+        if probe and scored == 0:
+            chunk = top_n
+        elif scored == 0:
+            chunk = len(match_ids) if affordable is None else max(top_n, affordable)
+        elif affordable is None or affordable < 1:
+            break
+        else:
+            chunk = affordable
+        stop = min(len(match_ids), scored + chunk)
+        started = time.perf_counter()
+        scores[scored:stop] = collaboration_scores(user_id, match_ids[scored:stop])
+        _record_model_cost(time.perf_counter() - started, stop - scored, replace=probe and scored == 0)
+        scored = stop
+    return scores, scored
+
+def get_reranked_matches(user_id, top_n=5):
+    n_candidates = max(top_n, Config.RERANK_CANDIDATES)
+    weight = Config.RERANK_WEIGHT
+    model_budget = Config.RERANK_MODEL_BUDGET_MS / 1000
+
+    # 🔍 Stage 1: ANN candidates
+    started = time.perf_counter()
+    match_ids, distances = ann_candidates(user_id, n_candidates)
+    ann_seconds = time.perf_counter() - started
+    similarity = 1 - distances.astype(np.float64)
+    collaboration = np.full(len(match_ids), np.nan)
+    order = np.arange(len(match_ids))
+
+    # 🤝 Stage 2: vectorized model passes over as many candidates as fit before the deadline
+    scored = 0
+    if ann_seconds <= Config.RERANK_ANN_BUDGET_MS / 1000 and len(match_ids) >= top_n:
+        affordable = _affordable_candidates(model_budget)
+        probe = affordable is not None and affordable < top_n and _should_probe()
+        if affordable is None or affordable >= top_n or probe:
+            collaboration, scored = _score_until(user_id, match_ids, top_n, time.perf_counter() + model_budget,
+                                                 probe)
+    if scored >= top_n:
+        blended = np.where(np.isnan(collaboration[:scored]), similarity[:scored],
+                           (1 - weight) * similarity[:scored] + weight * collaboration[:scored])
+        order = np.concatenate([np.argsort(-blended, kind='stable'), np.arange(scored, len(match_ids))])
+
+    matches = []
+    for pos in order:
+        candidate = get_candidate(match_ids[pos])
+        if candidate is None:
+            continue
+        score = collaboration[pos]
+        matches.append({
+            "user_id": candidate[0],
+            "name": candidate[1],
+            "city": candidate[2],
+            "profile_text": candidate[4],
+            "similarity_score": round(float(similarity[pos]), 2),
+            # None when this request fell back to ANN order
+            "collaboration_score": None if np.isnan(score) else round(float(score), 2),
+        })
+        if len(matches) == top_n:
+            break
+    return matches
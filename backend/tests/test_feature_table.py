@@ -0,0 +1,43 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # /backend
+from database.feature_table import FeatureTable  # noqa: E402
+from database.user_store import UserStore  # noqa: E402
+
+
+def test_api_twin_of_dataset_user_has_jaccard_one():
+    # Row 0 comes from the CSV; row 1 was created through the API with the same interest phrases
+    store = UserStore()
+    store.append_rows([
+        (1, 1, "Dataset User", "Leeds", "1990-01-01", "Finance Outdoor activities Pets", None),
+        (2, 2, "API Twin", "Leeds", "1990-01-01", "Outdoor activities Finance Pets",
+         '["Outdoor activities", "Finance", "Pets"]'),
+    ])
+    dataset = pd.DataFrame({
+        "Cleaned_Interests": ["['Outdoor activities', 'Finance', 'Pets']", None],
+        "DOB": ["1990-01-01", None],
+        "Country": ["United Kingdom", None],
+        "Gender": ["Female", None],
+    })
+    table = FeatureTable()
+    table.extend_from_dataset(dataset, store)
+
+    assert table.feature_matrix([0], [1])[0, 0] == 1.0
+
+
+def test_edited_user_keeps_interest_phrases():
+    store = UserStore()
+    store.append_rows([(1, 1, "Dataset User", "Leeds", "1990-01-01", "Finance Outdoor activities", None)])
+    table = FeatureTable()
+    table.extend_from_dataset(pd.DataFrame({
+        "Cleaned_Interests": ["['Outdoor activities', 'Finance']"], "DOB": ["1990-01-01"],
+        "Country": ["United Kingdom"], "Gender": ["Female"],
+    }), store)
+    store.subscribe(table.on_rows_added)
+
+    store.replace(1, "Dataset User", "Leeds", "1990-01-01", "Finance Outdoor activities",
+                  '["Finance", "Outdoor activities"]')
+
+    assert table.feature_matrix([0], [1])[0, 0] == 1.0
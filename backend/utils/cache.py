@@ -0,0 +1,260 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+def user_tag(user_id):
+    return f"user:{int(user_id)}"
+
+
+def cluster_tag(cluster):
+    return f"cluster:{int(cluster)}"
+
+
+class _LocalBackend:
+    """In-process OrderedDict in LRU order; entries carry their expiry time.
+
+    Every invalidation takes the next write sequence number and stamps it on
+    the tags it names. An entry remembers the sequence number current when
+    its computation started and is dead once any of its tags is stamped later.
+    Stamps are capped at maxsize: pruning drops the older half, and entries
+    started before the newest dropped stamp count as stale from then on.
+    """
+
+    name = "local"
+
+    def __init__(self, maxsize, count):
+        self.maxsize = maxsize
+        self._count = count
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._epoch = 0
+        self._sequence = 0
+        self._tag_sequence = {}
+        self._pruned_through = 0  # Stamps up to this sequence number were dropped
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _stale(self, tags, sequence):
+        if sequence < self._pruned_through:
+            return True
+        return any(self._tag_sequence.get(tag, 0) > sequence for tag in tags)
+
+    def _prune(self):
+        # Stamps no live entry predates are free to drop; past that, drop the older half
+        stamps = sorted(self._tag_sequence.values())
+        oldest_entry = min((entry[1] for entry in self._entries.values()), default=self._sequence)
+        threshold = max(stamps[len(stamps) // 2], min(oldest_entry, self._sequence))
+        self._tag_sequence = {tag: stamp for tag, stamp in self._tag_sequence.items() if stamp > threshold}
+        self._pruned_through = max(self._pruned_through, threshold)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, sequence, tags, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._count("expirations")
+                return False, None
+            if self._stale(tags, sequence):
+                del self._entries[key]
+                self._count("invalidations")
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl, tags, sequence):
+        with self._lock:
+            if key[0] != self._epoch or self._stale(tags, sequence):
+                return  # A write landed while it was being computed; already stale
+            self._entries[key] = (time.monotonic() + ttl, sequence, tuple(tags), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._count("evictions")
+
+    def version(self):
+        return self._epoch, self._sequence
+
+    def invalidate(self, tags):
+        with self._lock:
+            self._sequence += 1
+            for tag in tags:
+                self._tag_sequence[tag] = self._sequence
+            if len(self._tag_sequence) > self.maxsize:
+                self._prune()
+
+    def bump_epoch(self):
+        with self._lock:
+            self._epoch += 1
+            # Older epochs can never be read again; free them now
+            self._entries.clear()
+            self._tag_sequence.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _RedisBackend:
+    """Shared across workers; Redis applies the TTL and (maxmemory) LRU policy.
+
+    Same scheme as _LocalBackend: `<prefix>:sequence` is the write counter and
+    `<prefix>:tag:<tag>` holds the sequence number the tag was last invalidated
+    at. A stamp only matters to entries cached before it, which expire within
+    the TTL, so stamps expire too (after twice the TTL, for slow computations).
+    """
+
+    name = "redis"
+
+    def __init__(self, url, prefix, ttl):
+        import redis  # Optional dependency, only needed when CACHE_REDIS_URL is set
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._stamp_ttl = max(1, 2 * int(ttl))
+
+    def __len__(self):
+        return sum(1 for _ in self._client.scan_iter(f"{self._prefix}:v*"))
+
+    def _key(self, key):
+        return f"{self._prefix}:v{key[0]}:" + repr(key[1:])
+
+    def _stale(self, tags, sequence):
+        if not tags:
+            return False
+        stamps = self._client.mget([f"{self._prefix}:tag:{tag}" for tag in tags])
+        return any(int(stamp or 0) > sequence for stamp in stamps)
+
+    def get(self, key):
+        raw = self._client.get(self._key(key))
+        if raw is None:
+            return False, None
+        sequence, tags, value = pickle.loads(raw)
+        if self._stale(tags, sequence):
+            return False, None
+        return True, value
+
+    def set(self, key, value, ttl, tags, sequence):
+        if self._stale(tags, sequence):
+            return
+        self._client.setex(self._key(key), max(1, int(ttl)), pickle.dumps((sequence, tuple(tags), value)))
+
+    def version(self):
+        epoch, sequence = self._client.mget(f"{self._prefix}:version", f"{self._prefix}:sequence")
+        return int(epoch or 0), int(sequence or 0)
+
+    def invalidate(self, tags):
+        sequence = self._client.incr(f"{self._prefix}:sequence")
+        pipeline = self._client.pipeline(transaction=False)
+        for tag in tags:
+            pipeline.set(f"{self._prefix}:tag:{tag}", sequence, ex=self._stamp_ttl)
+        pipeline.execute()
+
+    def bump_epoch(self):
+        self._client.incr(f"{self._prefix}:version")
+
+    def clear(self):
+        for key in self._client.scan_iter(f"{self._prefix}:v*"):
+            self._client.delete(key)
+
+
+class ResponseCache:
+    """Bounded TTL + LRU cache for service results.
+
+    Keys are (epoch, namespace, *args), and each entry carries tags: the
+    users and communities its result depends on (user_tag, cluster_tag).
+    A user write calls `invalidate()` with that user's tags, which drops
+    only the entries tagged with them, including entries computed while
+    the write was in flight. `bump_epoch()` drops everything; it is meant
+    for batch changes such as an artifact swap or a new neighbour table.
+    A new user can't be matched to the entries that would now include
+    them, so other users' cached results pick them up within the TTL.
+    Counters (hits, misses, evictions, expirations, invalidations, errors)
+    are per process; see `stats()`.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300, enabled=True, redis_url=None, redis_prefix="skillmatch:cache"):
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0, "errors": 0}
+        if redis_url:
+            self._backend = _RedisBackend(redis_url, redis_prefix, ttl)
+        else:
+            self._backend = _LocalBackend(maxsize, self._count)
+        self.maxsize = maxsize
+
+    def get_or_compute(self, namespace, args, compute, tags=()):
+        # `tags` is a list of tags, or a function of the computed value returning them
+        if not self.enabled:
+            return compute()
+        try:
+            epoch, sequence = self._backend.version()
+            key = (epoch, namespace) + tuple(args)
+            found, value = self._backend.get(key)
+        except Exception:
+            # A shared store being down must not take the routes down with it
+            self._count("errors")
+            return compute()
+        self._count("hits" if found else "misses")
+        if found:
+            return value
+
+        value = compute()
+        try:
+            self._backend.set(key, value, self.ttl, tags(value) if callable(tags) else tags, sequence)
+        except Exception:
+            self._count("errors")
+        return value
+
+    def version(self):
+        # (epoch, write sequence): changes on any write; None if the shared store is unreachable
+        try:
+            return self._backend.version()
+        except Exception:
+            self._count("errors")
+            return None
+
+    def invalidate(self, *tags):
+        try:
+            self._backend.invalidate(tags)
+        except Exception:
+            self._count("errors")
+
+    def bump_epoch(self):
+        try:
+            self._backend.bump_epoch()
+        except Exception:
+            self._count("errors")
+
+    def clear(self):
+        try:
+            self._backend.clear()
+        except Exception:
+            self._count("errors")
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats.update(
+                backend=self._backend.name,
+                enabled=self.enabled,
+                maxsize=self.maxsize,
+                ttl_seconds=self.ttl,
+                hit_rate=round(stats["hits"] / lookups, 4) if lookups else None,
+            )
+        try:
+            stats["entries"] = len(self._backend)
+            stats["epoch"], stats["sequence"] = self._backend.version()
+        except Exception:
+            stats["entries"] = stats["epoch"] = stats["sequence"] = None
+        return stats
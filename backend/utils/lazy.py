@@ -0,0 +1,30 @@
+import threading
+
+# Shared by every resource so a loader can pull in the resources it depends on
+_load_lock = threading.RLock()
+
+
+class LazyResource:
+    """Value built on first `get()` and cached; `set()` replaces it in place."""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._loaded = False
+        self._value = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if not self._loaded:
+            with _load_lock:
+                if not self._loaded:
+                    self._value = self._loader()
+                    self._loaded = True
+        return self._value
+
+    def set(self, value):
+        with _load_lock:
+            self._value = value
+            self._loaded = True
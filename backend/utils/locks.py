@@ -0,0 +1,46 @@
+import threading
+from contextlib import contextmanager
+
+
+class RWLock:
+    """Many concurrent readers or one writer; waiting writers go first.
+
+    FAISS allows concurrent searches but not a search running alongside an
+    add/remove, so searches take `read()` and index mutations take `write()`.
+    Not reentrant: don't nest read() inside read().
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
@@ -0,0 +1,123 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from a cache hit to a cold model load
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if not isinstance(value, int) else str(value)
+
+
+class Histogram:
+    """Prometheus-style histogram with one series per label combination.
+
+    Kept in process memory: with several workers, each serves its own
+    numbers on /metrics (Prometheus sums them across scrape targets).
+    """
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum]
+
+    def observe(self, value, *labels):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][slot] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+request_seconds = Histogram("skillmatch_request_seconds", "Time to build each response, by route template",
+                            ("route", "method", "status"))
+stage_seconds = Histogram("skillmatch_stage_seconds",
+                          "Time spent in each stage (sql_fetch, faiss_search, feature_build, model_predict, "
+                          "encode, serialize)", ("stage",))
+enabled = True
+
+
+@contextmanager
+def timed(stage):
+    # with timed("faiss_search"): ... records the block's wall time for that stage
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage)
+
+
+def render_gauge(name, help_text, samples, kind="gauge"):
+    # samples: [(labels dict, value)]; None values are skipped (resource not loaded)
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is not None:
+            lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+    return lines
+
+
+def render_histograms():
+    return request_seconds.render() + stage_seconds.render()
+
+
+def init_app(app, profiler=None):
+    # Times every request by its route template (bounded label values, unlike
+    # raw paths). Streamed NDJSON responses are timed until the generator is
+    # handed back, not until the last line is sent.
+    from flask import g, request
+
+    global enabled
+    enabled = app.config.get("METRICS_ENABLED", True)
+    if not enabled and profiler is None:
+        return
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+        if profiler is not None:
+            profiler.start_request()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            seconds = time.perf_counter() - started
+            if enabled:
+                request_seconds.observe(seconds, route, request.method, str(response.status_code))
+            if profiler is not None:
+                profiler.finish_request(f"{request.method} {request.path}", seconds)
+        return response
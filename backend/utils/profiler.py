@@ -0,0 +1,77 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class SlowRequestSampler:
+    """Stack-sampling profiler that only looks at slow requests.
+
+    Requests register their thread on start. A background thread wakes
+    every `interval_ms` and records the current stack of each request that
+    has been running longer than `threshold_ms`; fast requests are never
+    sampled, so the cost is one dict insert/delete per request. When a slow
+    request finishes, its most frequent stacks are logged at WARNING.
+    """
+
+    def __init__(self, threshold_ms, interval_ms=5, max_depth=12, top=5):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.top = top
+        self._lock = threading.Lock()
+        self._active = {}  # thread ident -> (started, Counter of stacks)
+        self._worker = None
+        self._worker_pid = None
+
+    def start_request(self):
+        with self._lock:
+            self._ensure_worker()
+            self._active[threading.get_ident()] = (time.perf_counter(), Counter())
+
+    def finish_request(self, label, seconds):
+        with self._lock:
+            entry = self._active.pop(threading.get_ident(), None)
+            samples = Counter(entry[1]) if entry is not None else None
+        if not samples or seconds < self.threshold:
+            return
+        total = sum(samples.values())
+        report = "\n".join(f"  {count / total:5.1%} {' <- '.join(stack)}"
+                           for stack, count in samples.most_common(self.top))
+        logger.warning("slow_request request=%r seconds=%.3f samples=%d\n%s", label, seconds, total, report)
+
+    def _ensure_worker(self):
+        # Started lazily (and again in a forked child, where threads don't survive)
+        if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name="slow-request-sampler", daemon=True)
+            self._worker.start()
+
+    def _stack(self, frame):
+        # Innermost frame first, as "file:line function"
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}")
+            frame = frame.f_back
+        return tuple(stack)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            with self._lock:
+                slow = [(ident, samples) for ident, (started, samples) in self._active.items()
+                        if now - started >= self.threshold]
+            if not slow:
+                continue
+            frames = sys._current_frames()
+            stacks = [(samples, self._stack(frames[ident])) for ident, samples in slow if ident in frames]
+            del frames
+            with self._lock:
+                for samples, stack in stacks:
+                    samples[stack] += 1
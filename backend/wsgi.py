@@ -0,0 +1,33 @@
+"""Production entry point: `gunicorn -c gunicorn.conf.py wsgi:app` from backend/.
+
+Read-only servers (WRITES_ENABLED=0) run many workers with preload_app: this
+module runs once in the gunicorn master, so every artifact is loaded before
+the workers fork. The memory-mapped embeddings and FAISS index are shared
+through the page cache, and the user store, dataset and feature tables are
+shared copy-on-write instead of being loaded N times.
+
+Limitation: each process holds its own user store, embedding delta log and
+FAISS index, and nothing propagates writes between processes. So writes have
+a single owner. The /api/users routes and checkpoints run only in a process
+with WRITES_ENABLED=1 and exactly one worker (gunicorn.conf.py refuses to
+start otherwise, and doesn't preload or recycle it). Read-only workers answer
+those routes with 503, never write artifact files, and don't see users added
+by the writer until a version that includes them is published and activated
+(scripts/artifacts.py publish --source <writer's directory> --activate).
+They then switch within ARTIFACT_POLL_SECONDS.
+"""
+import gc
+import faiss
+from app import create_app
+from database.db_connection import warmup
+
+# No OpenMP thread pool in the master: GNU OpenMP threads don't survive fork.
+# Each worker sets its own thread count in gunicorn.conf.py's post_worker_init.
+faiss.omp_set_num_threads(1)
+
+app = create_app()
+warmup()
+
+# Move everything loaded so far out of the garbage collector's reach; GC passes
+# would otherwise write to those objects' headers and copy their pages per worker
+gc.freeze()
@@ -0,0 +1,78 @@
+# cluster_pipeline.py
+#
+# Interest_Cluster assignment that scales with the embedding file instead of RAM:
+# MiniBatchKMeans is fitted with small partial_fit steps over shuffled chunks of
+# the memory-mapped embeddings for several epochs (until inertia stops
+# improving), labels are predicted chunk by chunk, and the centroids are saved
+# so the backend can place new users by nearest centroid at ingest time. With
+# `user_ids` the labels are saved next to them as cluster_labels.npy ((n, 2)
+# UserID, cluster rows), so a published artifact version carries its own
+# communities instead of relying on processed_dataset.csv.
+
+import os
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans, kmeans_plusplus
+
+CLUSTER_CHUNK_SIZE = int(os.getenv("CLUSTER_CHUNK_SIZE", "50000"))  # Rows read from disk at a time
+CLUSTER_BATCH_SIZE = int(os.getenv("CLUSTER_BATCH_SIZE", "2048"))   # Rows per partial_fit step
+CLUSTER_EPOCHS = int(os.getenv("CLUSTER_EPOCHS", "10"))
+
+
+def fit_minibatch(embeddings, n_clusters=10, chunk_size=CLUSTER_CHUNK_SIZE, epochs=CLUSTER_EPOCHS,
+                  batch_size=CLUSTER_BATCH_SIZE, seed=42, tol=1e-3):
+    # Small steps over shuffled chunks for up to `epochs` passes; stops early once
+    # a pass improves the total inertia by less than `tol` (relative)
+    rng = np.random.default_rng(seed)
+    n = len(embeddings)
+    batch_size = max(batch_size, n_clusters)
+
+    # k-means++ seeding on a sample, like MiniBatchKMeans.fit's init_size
+    sample = np.sort(rng.choice(n, size=min(n, max(3 * batch_size, 3 * n_clusters)), replace=False))
+    centers, _ = kmeans_plusplus(np.asarray(embeddings[sample], dtype='float32'), n_clusters, random_state=seed)
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, init=centers, n_init=1, batch_size=batch_size,
+                             random_state=seed)
+
+    previous = None
+    for epoch in range(epochs):
+        inertia = 0.0
+        for start in rng.permutation(np.arange(0, n, chunk_size)):
+            chunk = np.asarray(embeddings[start:start + chunk_size], dtype='float32')
+            chunk = chunk[rng.permutation(len(chunk))]
+            for batch_start in range(0, len(chunk), batch_size):
+                batch = chunk[batch_start:batch_start + batch_size]
+                if len(batch) < n_clusters:
+                    continue  # partial_fit needs >= n_clusters rows; a short tail adds little
+                kmeans.partial_fit(batch)
+                inertia += kmeans.inertia_  # Of this batch, under the updated centers
+        if previous is not None and previous - inertia < tol * previous:
+            break
+        previous = inertia
+    return kmeans
+
+
+def predict_in_chunks(kmeans, embeddings, chunk_size=CLUSTER_CHUNK_SIZE):
+    labels = np.empty(len(embeddings), dtype=np.int32)
+    for start in range(0, len(embeddings), chunk_size):
+        labels[start:start + chunk_size] = kmeans.predict(np.asarray(embeddings[start:start + chunk_size],
+                                                                     dtype='float32'))
+    return labels
+
+
+def cluster_embeddings(embeddings, centroids_path, n_clusters=10, mode="minibatch",
+                       chunk_size=CLUSTER_CHUNK_SIZE, epochs=CLUSTER_EPOCHS, seed=42, user_ids=None):
+    # mode "full" keeps the original in-memory KMeans for small datasets
+    if mode == "full":
+        kmeans = KMeans(n_clusters=n_clusters, random_state=seed)
+        labels = kmeans.fit_predict(embeddings)
+    elif mode == "minibatch":
+        kmeans = fit_minibatch(embeddings, n_clusters, chunk_size, epochs, seed)
+        labels = predict_in_chunks(kmeans, embeddings, chunk_size)
+    else:
+        raise ValueError(f"Unknown clustering mode '{mode}', expected 'minibatch' or 'full'")
+
+    os.makedirs(os.path.dirname(centroids_path), exist_ok=True)
+    np.save(centroids_path, kmeans.cluster_centers_.astype('float32'))
+    if user_ids is not None:
+        np.save(os.path.join(os.path.dirname(centroids_path), "cluster_labels.npy"),
+                np.column_stack([np.asarray(user_ids, dtype=np.int64), labels.astype(np.int64)]))
+    return labels
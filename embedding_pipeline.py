@@ -0,0 +1,196 @@
+# embedding_pipeline.py
+#
+# Streaming Profile_Text -> embeddings stage shared by prepare_full_data.py and
+# prepare_data.py. The raw CSV is read in chunks, encoded in batches, and written
+# straight into a memory-mapped .npy, so RAM stays at one chunk. Embeddings are
+# cached by a hash of the normalized profile text, so a refresh only encodes
+# profiles that changed, and a progress file lets a crashed run resume.
+
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = int(os.getenv("PIPELINE_CHUNK_SIZE", "20000"))
+ENCODE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "256"))
+
+
+def clean_interests(row):
+    try:
+        interests = ast.literal_eval("[" + row + "]")
+        interests = list(set([i.strip().strip("'") for i in interests]))
+        return interests
+    except:
+        return []
+
+
+def profile_text(interests):
+    # Sorted so the same interest set always yields the same text (and hash)
+    return ' '.join(sorted(interests))
+
+
+def text_hash(text):
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent text-hash -> vector cache (SQLite), one namespace per model."""
+
+    def __init__(self, path, model_name):
+        self.model_name = model_name
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, hash)
+            )
+        ''')
+
+    def get_many(self, hashes):
+        found = {}
+        unique = list(set(hashes))
+        for start in range(0, len(unique), 500):  # Stay under SQLite's variable limit
+            batch = unique[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                [self.model_name] + batch
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype='float32')
+        return found
+
+    def put_many(self, items):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(self.model_name, key, np.asarray(vector, dtype='float32').tobytes()) for key, vector in items]
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def count_rows(csv_path, chunk_size=CHUNK_SIZE):
+    return sum(len(chunk) for chunk in pd.read_csv(csv_path, usecols=['UserID'], chunksize=chunk_size))
+
+
+def _atomic_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_encoder(model_name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def run_embedding_pipeline(raw_data_path, processed_data_path, embeddings_path, vector_ids_path, model_name,
+                           cache_path, chunk_size=CHUNK_SIZE, batch_size=ENCODE_BATCH_SIZE, encoder=None):
+    # `encoder` (anything with SentenceTransformer's encode/get_sentence_embedding_dimension)
+    # replaces loading `model_name`, which then only namespaces the cache
+    state_path = embeddings_path + ".progress.json"
+    partial_embeddings = embeddings_path + ".partial.npy"
+    partial_ids = vector_ids_path + ".partial.npy"
+    partial_csv = processed_data_path + ".partial"
+
+    raw_stat = os.stat(raw_data_path)
+    source = {"path": os.path.abspath(raw_data_path), "size": raw_stat.st_size,
+              "mtime": raw_stat.st_mtime, "model": model_name, "chunk_size": chunk_size}
+
+    # 🔁 Resume only if the same input, model and chunking were in progress
+    state = None
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+        partials = (partial_embeddings, partial_ids, partial_csv)
+        if state.get("source") != source or not all(map(os.path.exists, partials)):
+            state = None
+
+    model = None
+    cache = EmbeddingCache(cache_path, model_name)
+    if state is None:
+        total = count_rows(raw_data_path, chunk_size)
+        model = encoder or load_encoder(model_name)
+        dim = model.get_sentence_embedding_dimension()
+        vectors_out = np.lib.format.open_memmap(partial_embeddings, mode="w+", dtype='float32', shape=(total, dim))
+        ids_out = np.lib.format.open_memmap(partial_ids, mode="w+", dtype=np.int64, shape=(total,))
+        open(partial_csv, "w").close()
+        state = {"source": source, "total": total, "rows_done": 0, "csv_bytes": 0, "encoded": 0, "cached": 0}
+        _atomic_json(state_path, state)
+    else:
+        vectors_out = np.load(partial_embeddings, mmap_mode="r+")
+        ids_out = np.load(partial_ids, mmap_mode="r+")
+        # Drop CSV rows written after the last saved checkpoint
+        with open(partial_csv, "r+b") as f:
+            f.truncate(state["csv_bytes"])
+        print(f"🔁 Resuming at row {state['rows_done']:,} of {state['total']:,}")
+
+    row = 0
+    for chunk in pd.read_csv(raw_data_path, chunksize=chunk_size):
+        if row + len(chunk) <= state["rows_done"]:
+            row += len(chunk)
+            continue  # Finished before the crash
+
+        chunk['Cleaned_Interests'] = chunk['Interests'].apply(clean_interests)
+        chunk['Profile_Text'] = chunk['Cleaned_Interests'].apply(profile_text)
+        hashes = [text_hash(text) for text in chunk['Profile_Text']]
+
+        # 🗃️ Only encode profiles whose text hash isn't cached yet
+        found = cache.get_many(hashes)
+        missing = {}
+        for key, text in zip(hashes, chunk['Profile_Text']):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            if model is None:
+                model = encoder or load_encoder(model_name)
+            keys = list(missing)
+            encoded = model.encode([missing[key] for key in keys], batch_size=batch_size)
+            new_items = list(zip(keys, np.asarray(encoded, dtype='float32')))
+            cache.put_many(new_items)
+            found.update(new_items)
+
+        vectors_out[row:row + len(chunk)] = np.stack([found[key] for key in hashes])
+        ids_out[row:row + len(chunk)] = chunk['UserID'].to_numpy(dtype=np.int64)
+        vectors_out.flush()
+        ids_out.flush()
+        chunk.to_csv(partial_csv, mode="a", header=(row == 0), index=False)
+
+        row += len(chunk)
+        state.update(rows_done=row, csv_bytes=os.path.getsize(partial_csv),
+                     encoded=state["encoded"] + len(missing),
+                     cached=state["cached"] + len(chunk) - len(missing))
+        _atomic_json(state_path, state)
+        print(f"  ... {row:,}/{state['total']:,} rows ({state['encoded']:,} encoded, {state['cached']:,} from cache)")
+
+    cache.close()
+    dim = vectors_out.shape[1]
+    del vectors_out, ids_out
+    os.replace(partial_embeddings, embeddings_path)
+    os.replace(partial_ids, vector_ids_path)
+    os.replace(partial_csv, processed_data_path)
+    os.remove(state_path)
+    # The model these vectors came from, for artifact manifests (backend/scripts/artifacts.py)
+    _atomic_json(embeddings_path + ".json", {"model": model_name, "dim": int(dim)})
+
+    # Vectors ingested by the backend since the last build are keyed to the old file;
+    # POST /api/users/sync re-embeds any user that is missing after this rebuild
+    delta_path = embeddings_path + ".delta"
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
+
+    print(f"✅ Saved: {embeddings_path} ({state['total']:,} rows, {state['encoded']:,} newly encoded)")
+    return state
@@ -0,0 +1,38 @@
+import os
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# Flask backend (backend/app.py); override when it runs elsewhere
+BACKEND_URL = os.getenv("SKILLMATCH_BACKEND_URL", "http://localhost:5000/api")
+TIMEOUT_SECONDS = float(os.getenv("SKILLMATCH_BACKEND_TIMEOUT", "5"))
+# POST /users may load the sentence encoder on first use, which takes well over 5s
+WRITE_TIMEOUT_SECONDS = float(os.getenv("SKILLMATCH_BACKEND_WRITE_TIMEOUT", "60"))
+
+def never_sent(error):
+    # True only when the request provably didn't reach the backend (refused,
+    # DNS failure, connect timeout). Read timeouts, dropped connections and
+    # HTTP errors may come after the backend already committed the write.
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    cause = error.args[0] if isinstance(error, requests.ConnectionError) and error.args else None
+    return isinstance(getattr(cause, "reason", None), NewConnectionError)
+
+def create_user(name, dob, city, interests):
+    # Inserts, embeds and indexes the profile in one call so it is searchable right away
+    response = requests.post(
+        f"{BACKEND_URL}/users",
+        json={"name": name, "dob": dob, "city": city, "interests": list(interests)},
+        timeout=(TIMEOUT_SECONDS, WRITE_TIMEOUT_SECONDS),
+    )
+    response.raise_for_status()
+    return response.json()
+
+def match_text(interests, top_n=5):
+    # Top matches for an interest combination, encoded by the backend's shared encoder
+    response = requests.post(
+        f"{BACKEND_URL}/match/text",
+        json={"interests": list(interests), "top_n": top_n},
+        timeout=TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+    return response.json()
@@ -6,6 +6,8 @@ import faiss
 import os
 import sqlite3
 import gdown
+import requests
+import api_client
 from datetime import datetime
 from sentence_transformers import SentenceTransformer
 import warnings
@@ -26,37 +28,27 @@ st.set_page_config(
 def load_encoder():
     return SentenceTransformer('hkunlp/instructor-xl')
 
-encoder = load_encoder()
-
 # --- Paths ---
 base_path = os.path.dirname(os.path.abspath(__file__))
 database_path = os.path.join(base_path, "..", "backend", "database", "skillmatch.db")
-embeddings_path = os.path.join(base_path, "embeddings.npy")
 faiss_index_path = os.path.join(base_path, "faiss.index")
 
-# --- Download embeddings and index if missing ---
+# --- Fallback index: only downloaded and loaded once the backend is unreachable ---
 @st.cache_resource()
-def load_embeddings_and_index():
-    if not os.path.exists(embeddings_path):
-        gdown.download(
-            "https://drive.google.com/uc?id=1EPxqmQXd22QEA3shTkyDQTJgEcSWbx_1",
-            embeddings_path,
-            quiet=False
-        )
+def load_fallback_index():
     if not os.path.exists(faiss_index_path):
         gdown.download(
             "https://drive.google.com/uc?id=1lfnshv_eCvviasRLX6bYwwWQgk06fq7y",
             faiss_index_path,
             quiet=False
         )
-    embeddings = np.load(embeddings_path, allow_pickle=True)
-    index = faiss.read_index(faiss_index_path)
-    return embeddings, index
-
-embeddings, index = load_embeddings_and_index()
+    return faiss.read_index(faiss_index_path)
 
 # --- Connect to SQLite ---
-conn = sqlite3.connect(database_path)
+# WAL so the backend keeps reading while we write; wait out its write locks instead of failing
+conn = sqlite3.connect(database_path, timeout=5)
+conn.execute("PRAGMA journal_mode=WAL")
+conn.execute("PRAGMA busy_timeout=5000")
 cursor = conn.cursor()
 
 def load_users():
@@ -66,8 +58,16 @@ def load_users():
     return pd.DataFrame(data, columns=columns)
 
 def insert_user(name, dob, city, profile_text):
+    # Prefer the backend so the new profile is embedded and indexed immediately
+    try:
+        return api_client.create_user(name, dob, city, profile_text.split())
+    except requests.RequestException as e:
+        if not api_client.never_sent(e):
+            raise  # The backend may have saved it; a direct insert would duplicate the profile
+    # Backend unreachable: write directly; POST /api/users/sync indexes it later
     cursor.execute(
-        "INSERT INTO users (Name, DOB, City, Profile_Text) VALUES (?, ?, ?, ?)",
+        "INSERT INTO users (UserID, Name, DOB, City, Profile_Text) "
+        "SELECT COALESCE(MAX(UserID), 0) + 1, ?, ?, ?, ? FROM users",
         (name, dob, city, profile_text)
     )
     conn.commit()
@@ -187,8 +187,11 @@ if st.button("📝 Create My Profile"):
         st.warning("Please fill all fields and select at least one interest.")
     else:
         profile_txt = " ".join(selected_interests)
-        insert_user(name, dob.strftime("%Y-%m-%d"), city, profile_txt)
-        st.success("✅ Profile Created Successfully!")
+        try:
+            insert_user(name, dob.strftime("%Y-%m-%d"), city, profile_txt)
+            st.success("✅ Profile Created Successfully!")
+        except requests.RequestException as e:
+            st.error(f"⚠️ The backend didn't confirm your profile ({e}). Check the match list before retrying.")
 
 st.markdown("---")
 
@@ -199,53 +202,71 @@ top_n = st.slider("Select Number of Recommendations", 5, 50, value=5)
 if 'show_mutuals' not in st.session_state:
     st.session_state.show_mutuals = {}
 
+def find_matches(interests, top_n):
+    # Backend first: one shared encoder, micro-batched across every session
+    try:
+        return api_client.match_text(interests, top_n)
+    except requests.RequestException:
+        pass
+    # Backend unreachable: encode here and search the downloaded index
+    emb = load_encoder().encode(" ".join(interests))
+    emb = np.array([emb]).astype('float32')
+    distances, indices = load_fallback_index().search(emb, top_n + 1)
+    matches = []
+    for idx, distance in zip(indices[0][1:top_n+1], distances[0][1:top_n+1]):
+        if idx >= len(dataset):
+            continue
+        u = dataset.iloc[idx]
+        matches.append({
+            "user_id": u['UserID'],
+            "name": u['Name'],
+            "city": u['City'],
+            "profile_text": u['Profile_Text'],
+            "similarity_score": float(1 - distance),
+        })
+    return matches
+
 if st.button("✨ Find My Matches"):
     if not selected_interests:
         st.warning("⚡ Please select at least one interest to proceed.")
     else:
         st.success(f"Welcome {name or 'User'}! Finding your top {top_n} matches...")
 
-        txt = " ".join(selected_interests)
-        emb = encoder.encode(txt)
-        emb = np.array([emb]).astype('float32')
-        distances, indices = index.search(emb, top_n + 1)
+        recommendations = find_matches(selected_interests, top_n)
+        dob_by_user = dict(zip(dataset['UserID'], dataset['DOB']))
 
         st.markdown("---")
         st.subheader(f"🎉 Top {top_n} Recommended Friends")
         st.markdown('<div class="cards-wrapper">', unsafe_allow_html=True)
 
-        for rank, idx in enumerate(indices[0][1:top_n+1], start=1):
-            if idx >= len(dataset):
-                continue
-            u = dataset.iloc[idx]
+        for rank, match in enumerate(recommendations, start=1):
             featured = (rank == 1)
             card_cls = "profile-card featured" if featured else "profile-card"
 
-            dob_str = u['DOB']
+            dob_str = dob_by_user.get(match['user_id'])
             try:
                 dob_dt = datetime.strptime(dob_str, "%Y-%m-%d")
                 age = (datetime.now() - dob_dt).days // 365
             except:
                 age = "Unknown"
 
-            pos = np.where(indices[0] == idx)[0][0]
-            sim = round((1 - distances[0][pos]) * 100, 2)
+            sim = round(match['similarity_score'] * 100, 2)
 
             st.markdown(f"""
                 <div class="{card_cls}">
-                  <h4>👤 {u['Name']} from {u['City'] or 'Unknown'}</h4>
+                  <h4>👤 {match['name']} from {match['city'] or 'Unknown'}</h4>
                   <p><strong>Age:</strong> {age} years</p>
-                  <p><strong>Interests:</strong> 🌟 {u['Profile_Text']}</p>
+                  <p><strong>Interests:</strong> 🌟 {match['profile_text']}</p>
                   <p><strong>Similarity:</strong> 🔥 {sim}%</p>
                   <button class="send-btn">🤝 Send Friend Request</button>
             """, unsafe_allow_html=True)
 
-            key = f"mutuals_{idx}"
-            show_mutual = st.toggle(f"🔎 View Mutual Interests for {u['Name']}", key=key)
+            key = f"mutuals_{match['user_id']}"
+            show_mutual = st.toggle(f"🔎 View Mutual Interests for {match['name']}", key=key)
 
             if show_mutual:
                 current_interests = set(selected_interests)
-                user_interests = set(u['Profile_Text'].split())
+                user_interests = set((match['profile_text'] or "").split())
 
                 mutual_interests = current_interests.intersection(user_interests)
                 if mutual_interests:
@@ -288,9 +309,9 @@ if len(dataset) > 0:
 
     st.bar_chart(age_distribution.value_counts().sort_index())
 
-if 'distances' in locals():
+if 'recommendations' in locals():
     st.markdown("### 🔥 Similarity Score Distribution (Your Recommendations)")
-    sim_scores = [(1 - d) * 100 for d in distances[0][1:top_n+1]]
+    sim_scores = [match['similarity_score'] * 100 for match in recommendations]
     sim_df = pd.DataFrame({
         "Friend Rank": list(range(1, len(sim_scores)+1)),
         "Similarity (%)": sim_scores
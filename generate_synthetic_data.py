@@ -0,0 +1,183 @@
+# generate_synthetic_data.py
+#
+# Offline stand-in for SocialMediaUsersDataset.csv at any scale (10k - 10M users)
+# plus every artifact the backend serves, built by the same pipeline stages as
+# prepare_full_data.py. Profiles are embedded by FakeEncoder, a deterministic
+# hash-based encoder, so no model is downloaded and reruns are bit-identical.
+#
+#   python generate_synthetic_data.py --users 1000000 --output synthetic/1m
+#   SKILLMATCH_DATA_DIR=synthetic/1m SKILLMATCH_SQLITE_PATH=synthetic/1m/skillmatch.db \
+#       python backend/scripts/load_test.py
+
+import argparse
+import ast
+import hashlib
+import os
+import sys
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from embedding_pipeline import run_embedding_pipeline
+from pair_features import build_training_set
+from cluster_pipeline import cluster_embeddings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "scripts"))
+from build_index import RESCORE_FACTORS, build_index  # noqa: E402
+from migrate_to_sqlite import migrate  # noqa: E402
+from database.vector_index import save_index  # noqa: E402
+
+INTERESTS = [
+    "Movies", "Music", "Fashion", "Fitness", "Travel", "Photography", "Cooking", "Gaming", "Reading", "Art",
+    "Technology", "Sports", "Politics", "Science", "Nature", "Dancing", "Writing", "Finance", "Cars", "Pets",
+    "DIY and Crafts", "Gardening", "Outdoor activities", "Social causes and activism", "History", "Education",
+    "Business and entrepreneurship", "Parenting and family", "Beauty", "Health and wellness",
+]
+LOCATIONS = {
+    "United States": ["New York", "Los Angeles", "Chicago", "Houston", "Seattle"],
+    "India": ["Mumbai", "Delhi", "Bangalore", "Chennai", "Pune"],
+    "United Kingdom": ["London", "Manchester", "Birmingham", "Leeds"],
+    "Germany": ["Berlin", "Munich", "Hamburg", "Cologne"],
+    "Brazil": ["Sao Paulo", "Rio de Janeiro", "Brasilia"],
+    "Japan": ["Tokyo", "Osaka", "Kyoto"],
+    "Nigeria": ["Lagos", "Abuja", "Ibadan"],
+    "Canada": ["Toronto", "Vancouver", "Montreal"],
+}
+FIRST_NAMES = ["Alex", "Sam", "Priya", "Chen", "Maria", "Omar", "Aisha", "Lukas", "Yuki", "Diego", "Fatima",
+               "Noah", "Emma", "Ravi", "Sofia", "Kwame", "Hana", "Liam", "Zoe", "Mateo"]
+LAST_NAMES = ["Smith", "Patel", "Garcia", "Kim", "Müller", "Okafor", "Tanaka", "Silva", "Brown", "Khan",
+              "Nguyen", "Rossi", "Cohen", "Ivanov", "Mensah", "Larsen"]
+N_TASTES = 24  # Interest-preference groups, so users form real communities
+CHUNK_SIZE = 100000
+
+
+class FakeEncoder:
+    """Deterministic drop-in for SentenceTransformer (encode / get_sentence_embedding_dimension).
+
+    Each word gets a fixed random direction derived from its hash; a text's
+    vector is the normalized sum of its words' directions plus a little
+    per-text noise. Profiles sharing interests are close, like real
+    sentence embeddings, and the output depends only on the text and seed.
+    """
+
+    def __init__(self, dim=384, seed=0, noise=0.05):
+        self.dim = dim
+        self.seed = seed
+        self.noise = noise
+        self._word_vectors = {}
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _random_vector(self, key):
+        digest = hashlib.sha1(f"{self.seed}:{key}".encode("utf-8")).digest()
+        return np.random.default_rng(int.from_bytes(digest[:8], "little")).standard_normal(self.dim)
+
+    def encode(self, texts, batch_size=None, **kwargs):
+        out = np.empty((len(texts), self.dim), dtype='float32')
+        for i, text in enumerate(texts):
+            words = text.lower().split()
+            vector = self.noise * self._random_vector("text:" + " ".join(words))
+            for word in words:
+                if word not in self._word_vectors:
+                    self._word_vectors[word] = self._random_vector("word:" + word)
+                vector = vector + self._word_vectors[word]
+            out[i] = vector / max(np.linalg.norm(vector), 1e-12)
+        return out
+
+
+def taste_distributions(rng):
+    # Each taste favours a handful of interests (Dirichlet with a small concentration)
+    return rng.dirichlet(np.full(len(INTERESTS), 0.3), size=N_TASTES)
+
+
+def generate_chunk(rng, start, size, tastes):
+    user_ids = np.arange(start + 1, start + size + 1)
+    countries = list(LOCATIONS)
+    country_codes = rng.integers(0, len(countries), size)
+    city_picks = rng.integers(0, 1 << 30, size)
+    cities = [LOCATIONS[countries[c]][p % len(LOCATIONS[countries[c]])] for c, p in zip(country_codes, city_picks)]
+    dob_days = rng.integers(np.datetime64("1955-01-01").astype(int), np.datetime64("2006-12-31").astype(int), size)
+
+    taste_of_user = rng.integers(0, N_TASTES, size)
+    n_interests = rng.integers(1, 7, size)
+    picks = np.empty((size, 6), dtype=np.int64)
+    for taste in range(N_TASTES):
+        members = np.flatnonzero(taste_of_user == taste)
+        picks[members] = rng.choice(len(INTERESTS), size=(len(members), 6), p=tastes[taste])
+
+    return pd.DataFrame({
+        "UserID": user_ids,
+        "Name": [f"{FIRST_NAMES[a]} {LAST_NAMES[b]}" for a, b in
+                 zip(rng.integers(0, len(FIRST_NAMES), size), rng.integers(0, len(LAST_NAMES), size))],
+        "Gender": np.where(rng.random(size) < 0.5, "Male", "Female"),
+        "DOB": np.datetime_as_string(dob_days.astype("datetime64[D]")),
+        "Interests": [", ".join(f"'{INTERESTS[i]}'" for i in dict.fromkeys(row[:k]))
+                      for row, k in zip(picks, n_interests)],
+        "City": cities,
+        "Country": [countries[c] for c in country_codes],
+    })
+
+
+def write_raw_dataset(path, n_users, seed):
+    rng = np.random.default_rng(seed)
+    tastes = taste_distributions(rng)
+    for start in range(0, n_users, CHUNK_SIZE):
+        chunk = generate_chunk(rng, start, min(CHUNK_SIZE, n_users - start), tastes)
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=(start == 0), index=False)
+        print(f"  ... {start + len(chunk):,}/{n_users:,} raw rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset and all serving artifacts offline")
+    parser.add_argument("--users", type=int, default=10000, help="Number of users (10k - 10M)")
+    parser.add_argument("--output", default=os.path.join("synthetic", "default"), help="Data directory to create")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--clusters", type=int, default=10)
+    parser.add_argument("--training-pairs", type=int, default=200000)
+    parser.add_argument("--index-type", default="flat", help="See backend/scripts/build_index.py")
+    args = parser.parse_args()
+
+    output = args.output
+    model_dir = os.path.join(output, "models")
+    os.makedirs(model_dir, exist_ok=True)
+    raw_path = os.path.join(output, "SocialMediaUsersDataset.csv")
+    dataset_path = os.path.join(output, "processed_dataset.csv")
+    embeddings_path = os.path.join(output, "embeddings.npy")
+    vector_ids_path = os.path.join(output, "vector_ids.npy")
+    started = time.perf_counter()
+
+    # Step 1: Raw CSV in the schema prepare_full_data.py reads
+    write_raw_dataset(raw_path, args.users, args.seed)
+
+    # Steps 2-4: Cleaned interests, processed dataset and embeddings (fake encoder)
+    run_embedding_pipeline(raw_path, dataset_path, embeddings_path, vector_ids_path, f"fake-{args.dim}-{args.seed}",
+                           os.path.join(output, "embedding_cache.db"),
+                           encoder=FakeEncoder(args.dim, args.seed))
+    dataset = pd.read_csv(dataset_path)
+    dataset['Cleaned_Interests'] = dataset['Cleaned_Interests'].apply(ast.literal_eval)
+    embeddings = np.load(embeddings_path, mmap_mode='r')
+
+    # Step 5: Clusters and centroids
+    dataset['Interest_Cluster'] = cluster_embeddings(embeddings, os.path.join(model_dir, "cluster_centroids.npy"),
+                                                     n_clusters=args.clusters, user_ids=np.load(vector_ids_path))
+    dataset.to_csv(dataset_path, index=False)
+
+    # Step 6: Friendship model on the backend's four pair features
+    X, y = build_training_set(dataset, args.training_pairs, seed=args.seed)
+    joblib.dump(LogisticRegression().fit(X, y), os.path.join(model_dir, "friendship_model.pkl"))
+
+    # Step 7: FAISS index keyed by UserID, and the SQLite users table
+    user_ids = np.load(vector_ids_path)
+    save_index(build_index(embeddings, user_ids, args.index_type), os.path.join(output, "faiss.index"), len(user_ids),
+               rescore_factor=RESCORE_FACTORS.get(args.index_type, 1))
+    migrate(dataset_path, os.path.join(output, "skillmatch.db"))
+
+    print(f"\n🎯 {args.users:,} synthetic users in {output} ({time.perf_counter() - started:.0f}s). Serve them with:")
+    print(f"   SKILLMATCH_DATA_DIR={output} SKILLMATCH_SQLITE_PATH={os.path.join(output, 'skillmatch.db')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# pair_features.py
+#
+# Friendship-model training features for millions of user pairs. Interests are
+# encoded once as a sparse user x interest matrix; Jaccard for a block of pairs
+# is then a sparse element-wise product plus row sums, and blocks are spread
+# over a process pool. Columns match what the backend scores at serving time
+# (FeatureTable.feature_matrix): jaccard, age_difference, same_country, gender_match.
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+PAIRS_PER_TASK = 200000
+FEATURE_NAMES = ['jaccard', 'age_difference', 'same_country', 'gender_match']
+
+_shared = {}  # Inherited by forked workers instead of pickled per task
+
+
+def interest_matrix(interest_lists):
+    # Binary CSR matrix, one row per user, one column per distinct interest
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    for interests in interest_lists:
+        codes = {vocabulary.setdefault(interest, len(vocabulary)) for interest in interests}
+        indices.extend(sorted(codes))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sp.csr_matrix((data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+                           shape=(len(indptr) - 1, max(1, len(vocabulary))))
+    return matrix, vocabulary
+
+
+def ages_from_dob(dobs):
+    # Same rule as calculate_age; unparseable dates count as 0, like the backend
+    dates = pd.to_datetime(pd.Series(dobs), format="%Y-%m-%d", errors="coerce")
+    today = datetime.today()
+    before_birthday = (dates.dt.month > today.month) | ((dates.dt.month == today.month) & (dates.dt.day > today.day))
+    ages = today.year - dates.dt.year - before_birthday.astype(int)
+    return ages.fillna(0).to_numpy(dtype=np.int32)
+
+
+def category_codes(values):
+    # NaN/empty -> -1, which never matches (like NaN == NaN in the old pandas checks)
+    series = pd.Series(values).where(lambda s: s.astype(str).str.len() > 0)
+    codes, _ = pd.factorize(series)
+    return codes.astype(np.int32)
+
+
+def prepare_users(interest_lists, dobs, countries, genders):
+    matrix, _ = interest_matrix(interest_lists)
+    return {
+        "interests": matrix,
+        "interest_counts": np.diff(matrix.indptr),
+        "ages": ages_from_dob(dobs),
+        "countries": category_codes(countries),
+        "genders": category_codes(genders),
+    }
+
+
+def pair_features(users, rows1, rows2):
+    interests = users["interests"]
+    common = np.asarray(interests[rows1].multiply(interests[rows2]).sum(axis=1)).ravel()
+    counts = users["interest_counts"]
+    total = counts[rows1] + counts[rows2] - common
+    jaccard_similarity = np.divide(common, total, out=np.zeros(len(rows1)), where=total != 0)
+
+    ages = users["ages"]
+    age_difference = np.abs(ages[rows1] - ages[rows2])
+
+    countries = users["countries"]
+    same_country = (countries[rows1] == countries[rows2]) & (countries[rows1] >= 0)
+
+    genders = users["genders"]
+    gender_match = (genders[rows1] == genders[rows2]) & (genders[rows1] >= 0)
+
+    return np.column_stack([jaccard_similarity, age_difference, same_country, gender_match]).astype(np.float64)
+
+
+def sample_pairs(n_users, n_pairs, seed=42):
+    rng = np.random.default_rng(seed)
+    rows1 = rng.integers(0, n_users, size=n_pairs)
+    rows2 = rng.integers(0, n_users - 1, size=n_pairs)
+    rows2[rows2 >= rows1] += 1  # Never pair a user with themselves
+    return rows1, rows2
+
+
+def _features_task(bounds):
+    start, stop = bounds
+    return pair_features(_shared["users"], _shared["rows1"][start:stop], _shared["rows2"][start:stop])
+
+
+def compute_pair_features(users, rows1, rows2, workers=None, pairs_per_task=PAIRS_PER_TASK):
+    workers = workers or os.cpu_count() or 1
+    bounds = [(start, min(start + pairs_per_task, len(rows1))) for start in range(0, len(rows1), pairs_per_task)]
+
+    # Forked workers share the user arrays copy-on-write; spawn would re-run the
+    # calling prepare script, so platforms without fork stay single-process
+    if workers == 1 or len(bounds) <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return pair_features(users, rows1, rows2)
+
+    _shared.update(users=users, rows1=rows1, rows2=rows2)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            blocks = list(pool.map(_features_task, bounds))
+    finally:
+        _shared.clear()
+    return np.vstack(blocks)
+
+
+def build_training_set(dataset, n_pairs, workers=None, seed=42, threshold=0.3):
+    # Labels keep the original rule: strong when interest Jaccard > threshold
+    users = prepare_users(dataset['Cleaned_Interests'], dataset['DOB'], dataset['Country'], dataset['Gender'])
+    rows1, rows2 = sample_pairs(len(dataset), n_pairs, seed)
+    X = compute_pair_features(users, rows1, rows2, workers)
+    y = (X[:, 0] > threshold).astype(int)
+    return X, y